@@ -11,8 +11,13 @@ from extensions import db
 from config import Config
 
 
-def create_app(config_class=None):
-    """Create and configure the Flask application."""
+def create_app(config_class=None, start_runner: bool = True):
+    """Create and configure the Flask application.
+
+    Args:
+        config_class: Config object, defaults to config.Config.
+        start_runner: Start the background sync job runner.
+    """
     app = Flask(__name__)
 
     # Load configuration
@@ -26,27 +31,89 @@ def create_app(config_class=None):
     os.makedirs(zone_path, exist_ok=True)
     os.makedirs(app.config.get('CONFIG_OUTPUT_DIR', os.path.join(zone_path, 'configs')), exist_ok=True)
 
-    # Initialize extensions
+    # Load addon options (memoized, revalidated by mtime)
+    from services.options_service import addon_options
+    addon_options.init_app(app)
+
+    # Initialize extensions (engine tuning depends on the addon options)
+    from services.database import configure_engine_options, install_sqlite_pragmas
+    configure_engine_options(app)
     db.init_app(app)
+    install_sqlite_pragmas(app)
+
+    # Load provider schemas once; they are re-read only when files change
+    from services.schema_registry import schema_registry
+    schema_registry.init_app(app)
+
+    # Index installed octoDNS packages once; they only change on image rebuild
+    from services.package_index import package_index
+    package_index.init_app(app)
+
+    # Provider classes are introspected lazily; this only loads a persisted index
+    from services.provider_discovery import provider_discovery
+    provider_discovery.init_app(app)
 
     # Register blueprints
     from routes.main import bp as main_bp
     from routes.environment import bp as environment_bp
     from routes.providers import bp as providers_bp
+    from routes.sync import bp as sync_bp
+    from routes.imports import bp as imports_bp
+    from routes.zones import bp as zones_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(environment_bp)
     app.register_blueprint(providers_bp)
+    app.register_blueprint(sync_bp)
+    app.register_blueprint(imports_bp)
+    app.register_blueprint(zones_bp)
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Tables, migrations, encryption key and octoDNS config (once per deployment)
+    from services.startup import run_startup_tasks
+    run_startup_tasks(app)
 
-    return app
+    from services.job_log import job_log
+    job_log.init_app(app)
+
+    from services.source_cache import source_cache
+    source_cache.init_app(app)
+
+    from services.stats_cache import stats_cache
+    stats_cache.init_app(app)
 
+    from services.fragment_cache import fragment_cache
+    fragment_cache.init_app(app)
+
+    # Parsed zone file cache
+    from services.zone_loader import zone_loader
+    zone_loader.init_app(app)
+
+    # Zone search index (refreshed by the job runner and before searches)
+    from services.zone_index import zone_index
+    zone_index.init_app(app)
+
+    # Pre-sync zone validation (process pool, content-hash result cache)
+    from services.validation import validator
+    validator.init_app(app)
+
+    # Webhook and interval triggers (the scheduler ticks in the job runner)
+    from services.triggers import triggers
+    triggers.init_app(app)
+
+    # Under the Supervisor the GUI is only reachable through Ingress
+    if app.config.get('INGRESS_ONLY', bool(os.environ.get('SUPERVISOR_TOKEN'))):
+        from services.ingress import restrict_to_ingress
+        restrict_to_ingress(app)
+
+    # Start the background sync job runner
+    if start_runner and app.config.get('SYNC_RUNNER_ENABLED', True):
+        from services.job_runner import job_runner
+        job_runner.init_app(app)
+
+    return app
 
-# Create app instance for running directly
-app = create_app()
 
 if __name__ == '__main__':
+    # Development server; production runs gunicorn with wsgi.py
+    app = create_app()
     app.run(host='0.0.0.0', port=8100, debug=False)
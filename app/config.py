@@ -48,7 +48,18 @@ Config.SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 # Fernet key for encrypting secrets
 Config.FERNET_KEY = os.environ.get('FERNET_KEY') or None
+# Retired Fernet keys (comma-separated), still accepted for decryption
+Config.FERNET_OLD_KEYS = os.environ.get('FERNET_OLD_KEYS') or None
 
 # OctoDNS config output directory
 Config.CONFIG_OUTPUT_DIR = os.environ.get('CONFIG_OUTPUT_DIR') or \
     str(Path(Config.ZONE_FILE_PATH) / 'configs')
+
+# Only allow requests through the Ingress proxy (default: under the Supervisor).
+# INGRESS_ONLY=0 opens the GUI for local testing with a mapped port.
+if os.environ.get('INGRESS_ONLY'):
+    Config.INGRESS_ONLY = os.environ['INGRESS_ONLY'].strip().lower() in ('1', 'true', 'yes', 'on')
+# Peer addresses accepted as the Ingress proxy (comma-separated)
+if os.environ.get('INGRESS_ADDRESSES'):
+    Config.INGRESS_ADDRESSES = tuple(
+        a.strip() for a in os.environ['INGRESS_ADDRESSES'].split(',') if a.strip())
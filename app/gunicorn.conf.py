@@ -0,0 +1,50 @@
+"""Gunicorn configuration for the addon.
+
+Worker and thread counts come from the addon options (server_workers,
+server_threads), then environment variables, then the defaults below.
+Startup tasks run once in the master before the workers are forked.
+"""
+import os
+from pathlib import Path
+
+from config import Config
+from services.options_service import DEV_OPTIONS_FILENAME, OptionsService
+
+DEFAULT_WORKERS = 2
+# Each open log stream (SSE) occupies one thread
+DEFAULT_THREADS = 8
+DEFAULT_TIMEOUT = 120
+
+
+def _setting(name: str, default: int) -> int:
+    options = OptionsService(dev_options_path=str(Path(Config.ZONE_FILE_PATH) / DEV_OPTIONS_FILENAME))
+    value = options.get(force=True).get(name)
+    if value is None:
+        value = os.environ.get(name.upper())
+    return int(value) if value not in (None, '') else default
+
+
+bind = os.environ.get('BIND', '0.0.0.0:8100')
+worker_class = 'gthread'
+workers = max(1, _setting('server_workers', DEFAULT_WORKERS))
+threads = max(1, _setting('server_threads', DEFAULT_THREADS))
+timeout = _setting('server_timeout', DEFAULT_TIMEOUT)
+# Streams send heartbeats; keep idle connections short otherwise
+keepalive = 5
+accesslog = None
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    """Run the one-time startup tasks in the master process."""
+    from app import create_app
+    from extensions import db
+    from services.startup import mark_startup_done
+
+    app = create_app(start_runner=False)
+    with app.app_context():
+        # Never hand pooled connections to forked workers
+        db.engine.dispose()
+    mark_startup_done()
+    server.log.info(f"Startup tasks done, starting {workers} worker(s) x {threads} thread(s)")
@@ -1,8 +1,26 @@
 """SQLAlchemy database models."""
 from datetime import datetime
 
+from sqlalchemy.dialects import mysql
+
 from extensions import db
 
+# Prefix range queries need code point order, not MariaDB's case-insensitive default
+BINARY_TERM = db.String(255).with_variant(
+    mysql.VARCHAR(255, charset='utf8mb4', collation='utf8mb4_bin'), 'mysql', 'mariadb')
+
+
+class SchemaMigration(db.Model):
+    """Applied schema migrations (see services.migrations)."""
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.version}>'
+
 
 class EnvVar(db.Model):
     """Environment variables (secrets) storage."""
@@ -30,7 +48,7 @@ class Provider(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
-    source_zones = db.relationship('Zone', backref='source', lazy='dynamic',
+    source_zones = db.relationship('Zone', back_populates='source',
                                    foreign_keys='Zone.source_id')
 
     def __repr__(self):
@@ -43,12 +61,14 @@ class Zone(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)  # e.g. "example.com."
-    source_id = db.Column(db.Integer, db.ForeignKey('providers.id'), nullable=False)
+    source_id = db.Column(db.Integer, db.ForeignKey('providers.id'), nullable=False, index=True)
     options_json = db.Column(db.JSON, default=dict)  # lenient, processors, etc.
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
-    targets = db.relationship('ZoneTarget', backref='zone', lazy='dynamic',
+    source = db.relationship('Provider', back_populates='source_zones',
+                             foreign_keys=[source_id])
+    targets = db.relationship('ZoneTarget', backref='zone',
                               cascade='all, delete-orphan')
 
     def __repr__(self):
@@ -60,8 +80,8 @@ class ZoneTarget(db.Model):
     __tablename__ = 'zone_targets'
 
     id = db.Column(db.Integer, primary_key=True)
-    zone_id = db.Column(db.Integer, db.ForeignKey('zones.id'), nullable=False)
-    target_id = db.Column(db.Integer, db.ForeignKey('providers.id'), nullable=False)
+    zone_id = db.Column(db.Integer, db.ForeignKey('zones.id'), nullable=False, index=True)
+    target_id = db.Column(db.Integer, db.ForeignKey('providers.id'), nullable=False, index=True)
     target_options_json = db.Column(db.JSON, default=dict)  # Target-specific overrides
 
     # Relationships
@@ -71,16 +91,115 @@ class ZoneTarget(db.Model):
 class SyncJob(db.Model):
     """Track sync job executions."""
     __tablename__ = 'sync_jobs'
+    __table_args__ = (
+        # Job queue: WHERE status = 'pending' ORDER BY created_at
+        db.Index('ix_sync_jobs_status_created_at', 'status', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     status = db.Column(db.String(20), default='pending')  # pending, running, success, failed
-    trigger_type = db.Column(db.String(20))  # manual, webhook
+    trigger_type = db.Column(db.String(20))  # manual, webhook, schedule
     dry_run = db.Column(db.Boolean, default=False)
-    output = db.Column(db.Text)
+    scope_json = db.Column(db.JSON)  # {"zones": [...], "full": bool} or None for all zones
+    run_after = db.Column(db.DateTime)  # Debounced triggers wait until then
+    output = db.deferred(db.Column(db.Text))  # Legacy; new jobs log to files
     diff_json = db.Column(db.JSON)  # Parsed diff for UI display
     started_at = db.Column(db.DateTime)
     finished_at = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    @property
+    def zone_names(self) -> list[str] | None:
+        """Zones in scope, or None for a full sync."""
+        return (self.scope_json or {}).get('zones') or None
+
+    @property
+    def full_sync(self) -> bool:
+        """Plan every target, even if nothing changed since the last run."""
+        return bool((self.scope_json or {}).get('full'))
 
     def __repr__(self):
         return f'<SyncJob {self.id} {self.status}>'
+
+
+class SyncChange(db.Model):
+    """A single planned/applied record change of a sync job."""
+    __tablename__ = 'sync_changes'
+    __table_args__ = (
+        db.Index('ix_sync_changes_job_zone', 'job_id', 'zone'),
+        db.Index('ix_sync_changes_job_action', 'job_id', 'action'),
+        db.Index('ix_sync_changes_job_target', 'job_id', 'target'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('sync_jobs.id', ondelete='CASCADE'), nullable=False)
+    zone = db.Column(db.String(100), nullable=False)  # e.g. "example.com."
+    target = db.Column(db.String(50), nullable=False)  # Target provider name
+    action = db.Column(db.String(10), nullable=False)  # create, update, delete
+    record_name = db.Column(db.String(255), nullable=False)  # '' = zone apex
+    record_type = db.Column(db.String(10), nullable=False)
+
+    def __repr__(self):
+        return f'<SyncChange {self.action} {self.record_name} {self.record_type} @ {self.zone}>'
+
+
+class ZoneSyncState(db.Model):
+    """Last known sync state of a zone on one target, for incremental syncs."""
+    __tablename__ = 'zone_sync_states'
+    __table_args__ = (
+        db.UniqueConstraint('zone_id', 'target_id', name='uq_zone_sync_states_zone_target'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    zone_id = db.Column(db.Integer, db.ForeignKey('zones.id', ondelete='CASCADE'), nullable=False)
+    target_id = db.Column(db.Integer, db.ForeignKey('providers.id', ondelete='CASCADE'), nullable=False)
+    source_hash = db.Column(db.String(64))  # Hash of the source records
+    config_hash = db.Column(db.String(64))  # HMAC of the resolved target config
+    plan_hash = db.Column(db.String(64))  # Hash of the last non-empty plan
+    in_sync = db.Column(db.Boolean, default=False)  # Target matched the source after the last run
+    last_job_id = db.Column(db.Integer)
+    verified_at = db.Column(db.DateTime)  # Last plan against the target
+    applied_at = db.Column(db.DateTime)  # Last applied change set
+
+    def __repr__(self):
+        return f'<ZoneSyncState zone={self.zone_id} target={self.target_id} in_sync={self.in_sync}>'
+
+
+class ZoneIndexFile(db.Model):
+    """A zone file covered by the search index (see services.zone_index)."""
+    __tablename__ = 'zone_index_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    zone_name = db.Column(db.String(100), unique=True, nullable=False)  # e.g. "example.com."
+    mtime_ns = db.Column(db.BigInteger, nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    record_count = db.Column(db.Integer, default=0)
+    error = db.Column(db.String(255))  # Parse error, file is indexed without records
+    indexed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ZoneIndexFile {self.zone_name}>'
+
+
+class ZoneIndexEntry(db.Model):
+    """Inverted index row: one searchable term of a record in a zone file.
+
+    Every record has one 'fqdn' row and one 'value' row per value, so a
+    prefix lookup on term finds hostnames and values alike.
+    """
+    __tablename__ = 'zone_index_entries'
+    __table_args__ = (
+        db.Index('ix_zone_index_entries_term', 'term'),
+        db.Index('ix_zone_index_entries_file', 'file_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('zone_index_files.id', ondelete='CASCADE'), nullable=False)
+    term = db.Column(BINARY_TERM, nullable=False)  # Lowercased FQDN or value
+    kind = db.Column(db.String(5), nullable=False)  # fqdn, value
+    record_name = db.Column(db.String(255), nullable=False)  # '' = zone apex
+    record_type = db.Column(db.String(10), nullable=False)
+    value = db.Column(db.String(255))  # Displayed value (first value for multi-value records)
+
+    def __repr__(self):
+        return f'<ZoneIndexEntry {self.kind}:{self.term}>'
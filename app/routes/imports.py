@@ -0,0 +1,57 @@
+"""Import of an existing octoDNS setup."""
+import os
+
+from flask import Blueprint, current_app, flash, render_template, request
+
+from services.importer import ConfigImportError, import_octodns_config
+
+bp = Blueprint('imports', __name__, url_prefix='/import')
+
+
+def get_user_info():
+    """Extract user info from HA Ingress headers."""
+    return {
+        'id': request.headers.get('X-Remote-User-Id'),
+        'name': request.headers.get('X-Remote-User-Display-Name')
+               or request.headers.get('X-Remote-User-Name')
+               or 'Unknown',
+        'username': request.headers.get('X-Remote-User-Name'),
+    }
+
+
+@bp.route('/', methods=['GET', 'POST'])
+def index():
+    """Import providers and zones from an octoDNS config.yaml."""
+    user = get_user_info()
+    zone_path = current_app.config.get('ZONE_FILE_PATH', '/config/octodns')
+    form = {
+        'config_path': os.path.join(zone_path, 'import', 'config.yaml'),
+        'zones_dir': '',
+        'dry_run': True,
+    }
+    report = None
+
+    if request.method == 'POST':
+        form = {
+            'config_path': request.form.get('config_path', '').strip(),
+            'zones_dir': request.form.get('zones_dir', '').strip(),
+            'dry_run': request.form.get('dry_run') == 'on',
+        }
+        if not form['config_path']:
+            flash('Pfad zur config.yaml ist erforderlich.', 'danger')
+        elif form['zones_dir'] and not os.path.isdir(form['zones_dir']):
+            flash(f'Verzeichnis {form["zones_dir"]} existiert nicht.', 'danger')
+        else:
+            try:
+                report = import_octodns_config(form['config_path'], form['zones_dir'] or None,
+                                               dry_run=form['dry_run'])
+            except ConfigImportError as e:
+                flash(str(e), 'danger')
+            else:
+                if report.dry_run:
+                    flash('Prüfung abgeschlossen, es wurde nichts gespeichert.', 'success')
+                else:
+                    flash(f'{report.zones_created} Zone(n) und '
+                          f'{len(report.providers_created)} Provider importiert.', 'success')
+
+    return render_template('import/index.html', form=form, report=report, user=user)
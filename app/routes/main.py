@@ -1,8 +1,10 @@
 """Main routes (dashboard)."""
-from flask import Blueprint, render_template, request
+import time
 
-from extensions import db
-from models import EnvVar, Provider, Zone, SyncJob
+from flask import Blueprint, jsonify, render_template, request
+
+from services.stats_cache import stats_cache
+from services.zone_index import DEFAULT_LIMIT, MAX_LIMIT, zone_index
 
 bp = Blueprint('main', __name__)
 
@@ -23,12 +25,39 @@ def index():
     """Dashboard with overview."""
     user = get_user_info()
 
-    # Get counts for dashboard
-    stats = {
-        'env_vars': EnvVar.query.count(),
-        'providers': Provider.query.count(),
-        'zones': Zone.query.count(),
-        'recent_jobs': SyncJob.query.order_by(SyncJob.created_at.desc()).limit(5).all()
-    }
+    # Get counts for dashboard (cached, kept current by ORM events)
+    stats = stats_cache.get()
 
     return render_template('index.html', user=user, stats=stats)
+
+
+@bp.route('/search')
+def search():
+    """Find zones and records by hostname or value."""
+    user = get_user_info()
+    query = request.args.get('q', '').strip()
+    hits = zone_index.search(query) if query else []
+    files, records = zone_index.stats()
+    return render_template('search.html', user=user, query=query, hits=hits,
+                           limit=DEFAULT_LIMIT, indexed_files=files, indexed_records=records)
+
+
+@bp.route('/api/search')
+def api_search():
+    """Search the zone index (JSON)."""
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+    start = time.perf_counter()
+    hits = zone_index.search(query, limit=limit)
+    return jsonify({
+        'query': query,
+        'results': [{
+            'zone': hit.zone,
+            'name': hit.name,
+            'fqdn': hit.fqdn,
+            'type': hit.type,
+            'value': hit.value,
+            'exact': hit.exact,
+        } for hit in hits],
+        'took_ms': round((time.perf_counter() - start) * 1000, 2),
+    })
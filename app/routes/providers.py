@@ -1,15 +1,29 @@
 """Provider management routes."""
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+import json
+from datetime import datetime
+
+from flask import (
+    Blueprint, current_app, flash, make_response, redirect, render_template, request, url_for,
+)
 
 from extensions import db
 from models import Provider
+from services.config_generator import generate_config
+from services.fragment_cache import fragment_cache, make_token
 from services.provider_service import (
     get_all_provider_info,
     get_available_env_vars,
     get_enabled_provider_info,
+    get_installed_packages,
     get_provider_info,
+    get_provider_usage,
+    get_providers_with_usage,
     validate_provider_config,
 )
+from services.schema_registry import get_schema
+from services.source_cache import source_cache
+from services.stats_cache import stats_cache
+from services.sync_state import clear_states
 
 bp = Blueprint('providers', __name__, url_prefix='/providers')
 
@@ -29,7 +43,6 @@ def get_user_info():
 def index():
     """List all configured providers with extended info."""
     user = get_user_info()
-    providers = Provider.query.order_by(Provider.name).all()
 
     # Get provider info with versions and capabilities
     provider_info_map = {
@@ -39,13 +52,15 @@ def index():
 
     # Enrich providers with additional info
     enriched_providers = []
-    for provider in providers:
+    for provider, source_count, target_count in get_providers_with_usage():
         info = provider_info_map.get(provider.provider_type)
         enriched_providers.append({
             'provider': provider,
             'info': info,
             'version': info.installed_version if info else None,
             'is_enabled': info.is_enabled if info else True,
+            'source_zones': source_count,
+            'target_zones': target_count,
         })
 
     # Get available (enabled) provider types for display
@@ -117,6 +132,7 @@ def create():
         )
         db.session.add(provider)
         db.session.commit()
+        _regenerate_config()
 
         flash(f'Provider "{name}" wurde erstellt.', 'success')
         return redirect(url_for('providers.index'))
@@ -164,6 +180,8 @@ def edit(id):
         provider.name = name
         provider.config_json = config
         db.session.commit()
+        source_cache.invalidate(provider.id)
+        _regenerate_config()
 
         flash(f'Provider "{name}" wurde aktualisiert.', 'success')
         return redirect(url_for('providers.index'))
@@ -179,24 +197,43 @@ def delete(id):
     name = provider.name
 
     # Check if provider is in use
-    if provider.source_zones.count() > 0:
+    source_count, target_count = get_provider_usage(provider.id)
+    if source_count > 0:
         flash(f'Provider "{name}" wird als Source verwendet und kann nicht gelöscht werden.', 'danger')
         return redirect(url_for('providers.index'))
 
-    if provider.zone_targets:
+    if target_count > 0:
         flash(f'Provider "{name}" wird als Target verwendet und kann nicht gelöscht werden.', 'danger')
         return redirect(url_for('providers.index'))
 
+    clear_states(target_id=provider.id)
     db.session.delete(provider)
     db.session.commit()
+    source_cache.invalidate(provider.id)
+    _regenerate_config()
 
     flash(f'Provider "{name}" wurde gelöscht.', 'success')
     return redirect(url_for('providers.index'))
 
 
+@bp.route('/packages')
+def packages():
+    """Diagnostics view of installed octoDNS packages."""
+    user = get_user_info()
+    return render_template('providers/packages.html',
+                           packages=get_installed_packages(), user=user)
+
+
 @bp.route('/type-fields')
 def type_fields():
-    """Get form fields for a provider type (HTMX partial)."""
+    """Get form fields for a provider type (HTMX partial).
+
+    The fragment only depends on the schema file (or, without a schema,
+    the introspected fields), the provider's enabled/source state and
+    record types, the EnvVar keys and (in edit mode) the provider config.
+    These make up the ETag, so repeated requests are answered with 304 or
+    from the fragment cache.
+    """
     # HTMX sends select value as 'provider_type', also support 'type' for direct calls
     provider_type = request.args.get('provider_type', '') or request.args.get('type', '')
     config = {}
@@ -209,15 +246,49 @@ def type_fields():
             config = provider.config_json or {}
 
     info = get_provider_info(provider_type)
-    env_vars = get_available_env_vars()
 
     if not info:
         return '<p style="color: var(--secondary-text-color);">Bitte wähle einen Provider-Typ aus.</p>'
 
-    return render_template('providers/_type_fields.html',
-                           type_info=info,
-                           config=config,
-                           env_vars=env_vars)
+    schema = get_schema(info.class_name)
+    env_keys, env_changed = stats_cache.env_var_keys()
+    token = make_token(
+        info.class_name,
+        schema.signature if schema else info.fields,
+        info.installed_version,
+        info.is_enabled,
+        info.is_source,
+        info.supports,
+        env_keys,
+        json.dumps(config, sort_keys=True, default=str),
+    )
+
+    html = fragment_cache.get_or_render(token, lambda: render_template(
+        'providers/_type_fields.html',
+        type_info=info,
+        config=config,
+        env_vars=[{'key': key, 'reference': f'env/{key}'} for key in env_keys],
+    ))
+
+    response = make_response(html)
+    response.set_etag(token)
+    schema_mtime = datetime.utcfromtimestamp(schema.signature[0] / 1e9) if schema else env_changed
+    response.last_modified = max(schema_mtime, env_changed)
+    # Always revalidate; the ETag makes that cheap
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _regenerate_config():
+    """Update the octoDNS config after a provider change.
+
+    Failures are logged only; the database change has already been committed.
+    """
+    try:
+        generate_config()
+    except Exception as e:
+        current_app.logger.error(f"Failed to generate octoDNS config: {e}")
 
 
 def _extract_config_from_form(fields: list) -> dict:
@@ -0,0 +1,233 @@
+"""Sync job routes."""
+import time
+
+from flask import (Blueprint, Response, abort, flash, jsonify, redirect, render_template,
+                   request, send_file, stream_with_context, url_for)
+from markupsafe import escape
+
+from extensions import db
+from models import SyncJob
+from services.job_log import job_log
+from services.job_runner import STATUS_PENDING, STATUS_RUNNING, job_runner
+from services.provider_service import get_zones_with_targets
+from services.source_cache import source_cache
+from services.triggers import normalize_zone_name, triggers
+from services.sync_changes import ACTIONS, change_counts, change_summary, query_changes
+from services.validation import validator
+
+# Seconds between two polls of the log file while streaming
+STREAM_POLL_INTERVAL = 1.0
+# Send an SSE comment after this many idle seconds to keep proxies happy
+STREAM_HEARTBEAT = 15.0
+
+bp = Blueprint('sync', __name__, url_prefix='/sync')
+
+
+def get_user_info():
+    """Extract user info from HA Ingress headers."""
+    return {
+        'id': request.headers.get('X-Remote-User-Id'),
+        'name': request.headers.get('X-Remote-User-Display-Name')
+               or request.headers.get('X-Remote-User-Name')
+               or 'Unknown',
+        'username': request.headers.get('X-Remote-User-Name'),
+    }
+
+
+def _render_index(**context):
+    user = get_user_info()
+    jobs = SyncJob.query.order_by(SyncJob.created_at.desc()).limit(50).all()
+    zones = get_zones_with_targets()
+    counts = change_counts([job.id for job in jobs])
+    return render_template('sync/index.html', jobs=jobs, zones=zones,
+                           change_counts=counts, cache_stats=source_cache.stats(),
+                           user=user, **context)
+
+
+@bp.route('/')
+def index():
+    """List sync jobs and offer to start a new one."""
+    return _render_index(validation=None, selected=[])
+
+
+@bp.route('/validate', methods=['POST'])
+def validate():
+    """Validate the selected zones (HTMX partial)."""
+    zones = [z for z in request.form.getlist('zones') if z]
+    return render_template('sync/_validation.html', validation=validator.validate(zones or None))
+
+
+@bp.route('/run', methods=['POST'])
+def run():
+    """Validate the selected zones and queue a manual sync job."""
+    dry_run = request.form.get('dry_run') == 'on'
+    full_sync = request.form.get('full_sync') == 'on'
+    zones = [z for z in request.form.getlist('zones') if z]
+
+    report = validator.validate(zones or None)
+    if not report.ok:
+        flash(f'Validierung fehlgeschlagen ({report.errors} Fehler), Sync wurde nicht eingereiht.', 'danger')
+        return _render_index(validation=report, selected=zones)
+
+    job = job_runner.enqueue(trigger_type='manual', dry_run=dry_run, zones=zones or None,
+                             full_sync=full_sync)
+
+    flash(f'Sync-Job #{job.id} wurde eingereiht.', 'success')
+    return redirect(url_for('sync.detail', id=job.id))
+
+
+@bp.route('/webhook', methods=['POST'])
+def webhook():
+    """Queue a debounced sync for an external event (e.g. a NetBox webhook).
+
+    Zones come from ?zone=... query parameters or the JSON payload; without
+    any, all zones are synced. Events within the debounce window are
+    merged into one job.
+    """
+    if not triggers.webhook_token():
+        abort(404)
+    if not triggers.verify_request(request.headers, request.get_data()):
+        abort(403)
+
+    zones = [normalize_zone_name(z) for z in request.args.getlist('zone') if z] or \
+        triggers.zones_from_payload(request.get_json(silent=True))
+    job, created = triggers.submit('webhook', zones)
+    if job is None:
+        return jsonify({'status': 'ignored', 'reason': 'no managed zone affected'}), 202
+
+    return jsonify({
+        'status': 'queued' if created else 'merged',
+        'job_id': job.id,
+        'zones': job.zone_names,
+        'run_after': job.run_after.isoformat() + 'Z' if job.run_after else None,
+    }), 202
+
+
+@bp.route('/source-cache/clear', methods=['POST'])
+def clear_source_cache():
+    """Drop all source zone snapshots."""
+    removed = source_cache.invalidate()
+    flash(f'{removed} Source-Snapshot(s) gelöscht.', 'success')
+    return redirect(url_for('sync.index'))
+
+
+@bp.route('/<int:id>')
+def detail(id):
+    """Show a sync job."""
+    user = get_user_info()
+    job = SyncJob.query.get_or_404(id)
+    log_text, log_offset, truncated = job_log.tail(job.id)
+    return render_template('sync/detail.html', job=job, user=user,
+                           summary=change_summary(job.id), actions=ACTIONS,
+                           log_text=log_text, log_offset=log_offset,
+                           log_truncated=truncated, has_log=job_log.exists(job.id),
+                           is_active=job.status in (STATUS_PENDING, STATUS_RUNNING))
+
+
+def _changes_page(job_id: int):
+    return query_changes(
+        job_id,
+        zone=request.args.get('zone') or None,
+        action=request.args.get('action') or None,
+        target=request.args.get('target') or None,
+        page=request.args.get('page', 1, type=int),
+        per_page=request.args.get('per_page', 50, type=int),
+    )
+
+
+@bp.route('/<int:id>/changes')
+def changes(id):
+    """Paginated, filterable change list (HTMX partial)."""
+    job = SyncJob.query.get_or_404(id)
+    page = _changes_page(job.id)
+    return render_template('sync/_changes.html', job=job, page=page,
+                           filters={k: request.args.get(k, '') for k in ('zone', 'action', 'target')})
+
+
+@bp.route('/<int:id>/changes.json')
+def changes_json(id):
+    """Paginated, filterable change list as JSON."""
+    job = SyncJob.query.get_or_404(id)
+    page = _changes_page(job.id)
+    return jsonify({
+        'job_id': job.id,
+        'page': page.page,
+        'pages': page.pages,
+        'total': page.total,
+        'summary': change_summary(job.id) if page.page == 1 else None,
+        'changes': [
+            {
+                'zone': c.zone,
+                'target': c.target,
+                'action': c.action,
+                'name': c.record_name,
+                'type': c.record_type,
+            }
+            for c in page.items
+        ],
+    })
+
+
+@bp.route('/<int:id>/log')
+def log(id):
+    """Download the full job log."""
+    job = SyncJob.query.get_or_404(id)
+    if not job_log.exists(job.id):
+        abort(404)
+    return send_file(job_log.path(job.id), mimetype='text/plain',
+                     as_attachment=True, download_name=f'sync-job-{job.id}.log')
+
+
+def _sse(data: str, event: str = None) -> str:
+    lines = [f'event: {event}'] if event else []
+    lines.extend(f'data: {line}' for line in data.split('\n'))
+    return '\n'.join(lines) + '\n\n'
+
+
+def _escape(line: str) -> str:
+    """HTML-escape a log line; the HTMX sse extension swaps data in as HTML."""
+    return str(escape(line)) + '\n'
+
+
+def _job_status(job_id: int) -> str:
+    status = db.session.query(SyncJob.status).filter_by(id=job_id).scalar()
+    db.session.rollback()  # end the read transaction so the next poll sees new data
+    return status
+
+
+@bp.route('/<int:id>/stream')
+def stream(id):
+    """Stream new log lines as server-sent events (HTMX sse extension)."""
+    if _job_status(id) is None:
+        abort(404)
+    offset = request.args.get('offset', 0, type=int)
+
+    @stream_with_context
+    def generate():
+        position = offset
+        idle = 0.0
+        while True:
+            lines, position = job_log.read_from(id, position)
+            if lines:
+                idle = 0.0
+                for line in lines:
+                    yield _sse(_escape(line))
+                continue
+
+            if _job_status(id) not in (STATUS_PENDING, STATUS_RUNNING):
+                # Flush anything written right before the status change
+                lines, position = job_log.read_from(id, position)
+                for line in lines:
+                    yield _sse(_escape(line))
+                yield _sse('done', event='done')
+                return
+
+            time.sleep(STREAM_POLL_INTERVAL)
+            idle += STREAM_POLL_INTERVAL
+            if idle >= STREAM_HEARTBEAT:
+                idle = 0.0
+                yield ': keepalive\n\n'
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
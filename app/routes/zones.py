@@ -0,0 +1,127 @@
+"""Zone file routes (view, edit and create octoDNS YAML zone files)."""
+import os
+import re
+from datetime import datetime
+
+import yaml
+from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
+
+from models import ZoneIndexFile
+from services.utils import SafeLoader, write_atomic
+from services.zone_files import list_zone_files, zone_files_dir
+from services.zone_loader import zone_loader
+
+bp = Blueprint('zones', __name__, url_prefix='/zones')
+
+ZONE_NAME_PATTERN = re.compile(r'^([a-z0-9_]([a-z0-9_-]*[a-z0-9_])?\.)+$')
+EMPTY_ZONE = "---\n{}\n"
+RECORDS_PER_PAGE = 500
+
+
+def get_user_info():
+    """Extract user info from HA Ingress headers."""
+    return {
+        'id': request.headers.get('X-Remote-User-Id'),
+        'name': request.headers.get('X-Remote-User-Display-Name')
+               or request.headers.get('X-Remote-User-Name')
+               or 'Unknown',
+        'username': request.headers.get('X-Remote-User-Name'),
+    }
+
+
+def _normalize(zone_name: str) -> str:
+    zone_name = zone_name.strip().lower()
+    return zone_name if zone_name.endswith('.') else f'{zone_name}.'
+
+
+def _zone_or_404(zone_name: str) -> str:
+    zone_name = _normalize(zone_name)
+    if not ZONE_NAME_PATTERN.match(zone_name) or not os.path.isfile(zone_loader.path(zone_name)):
+        abort(404)
+    return zone_name
+
+
+@bp.route('/')
+def index():
+    """List all zone files."""
+    user = get_user_info()
+    record_counts = {row.zone_name: row.record_count for row in ZoneIndexFile.query}
+    zones = []
+    for zone_name, entry in sorted(list_zone_files(zone_files_dir()).items()):
+        stat = entry.stat()
+        zones.append({
+            'name': zone_name,
+            'size': stat.st_size,
+            'modified': datetime.fromtimestamp(stat.st_mtime),
+            'records': record_counts.get(zone_name),
+        })
+    return render_template('zones.html', zones=zones, user=user)
+
+
+@bp.route('/new', methods=['GET', 'POST'])
+def new():
+    """Create an empty zone file."""
+    user = get_user_info()
+
+    if request.method == 'POST':
+        zone_name = _normalize(request.form.get('zone_name', ''))
+        if not ZONE_NAME_PATTERN.match(zone_name):
+            return render_template('new_zone.html', error='Ungültiger Zonenname.', user=user)
+
+        path = zone_loader.path(zone_name)
+        if os.path.exists(path):
+            return render_template('new_zone.html', error='Diese Zone existiert bereits.', user=user)
+
+        write_atomic(path, EMPTY_ZONE)
+        flash(f'Zone "{zone_name}" wurde erstellt.', 'success')
+        return redirect(url_for('zones.edit', zone_name=zone_name))
+
+    return render_template('new_zone.html', user=user)
+
+
+@bp.route('/<zone_name>')
+def view(zone_name):
+    """Show the records of a zone file."""
+    user = get_user_info()
+    zone_name = _zone_or_404(zone_name)
+    error = None
+    records = ()
+    try:
+        zone = zone_loader.load(zone_name)
+        records = zone.records if zone else ()
+    except yaml.YAMLError as e:
+        error = f'Zone-Datei ist ungültig: {e}'
+
+    pages = max(1, -(-len(records) // RECORDS_PER_PAGE))
+    page = min(max(request.args.get('page', 1, type=int), 1), pages)
+    start = (page - 1) * RECORDS_PER_PAGE
+    return render_template('zone.html', zone_name=zone_name, error=error, user=user,
+                           records=records[start:start + RECORDS_PER_PAGE],
+                           total=len(records), page=page, pages=pages)
+
+
+@bp.route('/<zone_name>/edit', methods=['GET', 'POST'])
+def edit(zone_name):
+    """Edit the YAML of a zone file."""
+    user = get_user_info()
+    zone_name = _zone_or_404(zone_name)
+    path = zone_loader.path(zone_name)
+
+    if request.method == 'POST':
+        yaml_content = request.form.get('yaml_content', '').replace('\r\n', '\n')
+        try:
+            data = yaml.load(yaml_content, Loader=SafeLoader)
+        except yaml.YAMLError as e:
+            return render_template('edit_zone.html', zone_name=zone_name, yaml_content=yaml_content,
+                                   error=f'Ungültiges YAML: {e}', user=user)
+        if data is not None and not isinstance(data, dict):
+            return render_template('edit_zone.html', zone_name=zone_name, yaml_content=yaml_content,
+                                   error='Die Zone muss ein Mapping von Record-Namen sein.', user=user)
+
+        write_atomic(path, yaml_content if yaml_content.endswith('\n') else f'{yaml_content}\n')
+        flash(f'Zone "{zone_name}" wurde gespeichert.', 'success')
+        return redirect(url_for('zones.view', zone_name=zone_name))
+
+    with open(path, 'r', encoding='utf-8') as f:
+        yaml_content = f.read()
+    return render_template('edit_zone.html', zone_name=zone_name, yaml_content=yaml_content, user=user)
@@ -0,0 +1,197 @@
+"""OctoDNS config generation.
+
+Renders the configured providers and zones into an octoDNS config.yaml in
+CONFIG_OUTPUT_DIR. Each provider and zone section is rendered separately
+and cached by a hash of its content, so only changed sections are dumped
+again and the file is only rewritten when the result actually differs.
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import yaml
+from flask import current_app
+
+from extensions import db
+from models import Provider, Zone, ZoneTarget
+from services.utils import write_atomic
+
+CONFIG_FILENAME = 'config.yaml'
+CONFIG_HEADER = '# Generated by OctoDNS GUI - manual changes will be overwritten\n'
+
+
+@dataclass
+class ConfigResult:
+    """Outcome of a config generation run."""
+    path: str
+    changed: bool
+    digest: str
+    providers: int
+    zones: int
+    rendered_sections: int
+
+
+def _fingerprint(data) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _indent(text: str, prefix: str = '  ') -> str:
+    return ''.join(prefix + line if line.strip() else line
+                   for line in text.splitlines(keepends=True))
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def provider_section(provider: Provider) -> dict:
+    """Build the octoDNS provider entry (env/ references are kept as-is)."""
+    section = {'class': provider.provider_type}
+    for key, value in (provider.config_json or {}).items():
+        if value is None or value == '':
+            continue
+        section[key] = value
+    return section
+
+
+def zone_section(source_name: str, target_names: list[str], options: dict) -> dict:
+    """Build the octoDNS zone entry."""
+    section = {'sources': [source_name], 'targets': sorted(target_names)}
+    for key, value in (options or {}).items():
+        if key not in section:
+            section[key] = value
+    return section
+
+
+class ConfigGenerator:
+    """Incremental octoDNS config renderer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (kind, name) -> (fingerprint, rendered yaml)
+        self._fragments: dict[tuple[str, str], tuple[str, str]] = {}
+        # output path -> digest of the last content written or seen on disk
+        self._digests: dict[str, str] = {}
+
+    def _render(self, kind: str, name: str, data: dict) -> tuple[str, bool]:
+        """Render one section, reusing the cached text if unchanged.
+
+        Returns:
+            Tuple of (rendered_text, was_rendered).
+        """
+        fingerprint = _fingerprint(data)
+        cached = self._fragments.get((kind, name))
+        if cached and cached[0] == fingerprint:
+            return cached[1], False
+
+        text = _indent(yaml.safe_dump({name: data}, default_flow_style=False,
+                                      sort_keys=False, allow_unicode=True))
+        self._fragments[(kind, name)] = (fingerprint, text)
+        return text, True
+
+    def _load_sections(self) -> tuple[dict[str, dict], dict[str, dict]]:
+        """Load all providers, zones and targets in three flat queries."""
+        providers = Provider.query.order_by(Provider.name).all()
+        names_by_id = {p.id: p.name for p in providers}
+
+        targets_by_zone: dict[int, list[str]] = {}
+        for zone_id, target_id in db.session.query(ZoneTarget.zone_id, ZoneTarget.target_id):
+            if target_id in names_by_id:
+                targets_by_zone.setdefault(zone_id, []).append(names_by_id[target_id])
+
+        provider_sections = {p.name: provider_section(p) for p in providers}
+        zone_sections = {}
+        rows = db.session.query(Zone.id, Zone.name, Zone.source_id, Zone.options_json) \
+            .order_by(Zone.name)
+        for zone_id, name, source_id, options in rows:
+            source_name = names_by_id.get(source_id)
+            if not source_name:
+                continue
+            zone_sections[name] = zone_section(source_name, targets_by_zone.get(zone_id, []), options)
+
+        return provider_sections, zone_sections
+
+    def generate(self, output_dir: str) -> ConfigResult:
+        """Render the config and write it if the content changed.
+
+        Args:
+            output_dir: Directory for config.yaml.
+
+        Returns:
+            ConfigResult describing what happened.
+        """
+        path = os.path.join(output_dir, CONFIG_FILENAME)
+        provider_sections, zone_sections = self._load_sections()
+
+        with self._lock:
+            rendered = 0
+            parts = [CONFIG_HEADER, 'providers:\n' if provider_sections else 'providers: {}\n']
+            for name, data in provider_sections.items():
+                text, was_rendered = self._render('provider', name, data)
+                parts.append(text)
+                rendered += was_rendered
+            parts.append('zones:\n' if zone_sections else 'zones: {}\n')
+            for name, data in zone_sections.items():
+                text, was_rendered = self._render('zone', name, data)
+                parts.append(text)
+                rendered += was_rendered
+
+            # Drop fragments of deleted providers/zones
+            live = {('provider', n) for n in provider_sections} | {('zone', n) for n in zone_sections}
+            for key in list(self._fragments):
+                if key not in live:
+                    del self._fragments[key]
+
+            content = ''.join(parts)
+            digest = hashlib.sha256(content.encode()).hexdigest()
+
+            if path not in self._digests:
+                existing = _file_digest(path)
+                if existing:
+                    self._digests[path] = existing
+
+            changed = self._digests.get(path) != digest or not os.path.exists(path)
+            if changed:
+                write_atomic(path, content)
+                self._digests[path] = digest
+
+        return ConfigResult(
+            path=path,
+            changed=changed,
+            digest=digest,
+            providers=len(provider_sections),
+            zones=len(zone_sections),
+            rendered_sections=rendered,
+        )
+
+
+config_generator = ConfigGenerator()
+
+
+def _output_dir() -> str:
+    zone_path = current_app.config.get('ZONE_FILE_PATH', '/config/octodns')
+    return current_app.config.get('CONFIG_OUTPUT_DIR') or os.path.join(zone_path, 'configs')
+
+
+def get_config_path() -> str:
+    """Get the path of the generated octoDNS config."""
+    return os.path.join(_output_dir(), CONFIG_FILENAME)
+
+
+def generate_config() -> ConfigResult:
+    """Generate the octoDNS config into CONFIG_OUTPUT_DIR."""
+    result = config_generator.generate(_output_dir())
+    if result.changed:
+        current_app.logger.info(
+            f"Wrote octoDNS config {result.path} "
+            f"({result.providers} providers, {result.zones} zones, "
+            f"{result.rendered_sections} sections re-rendered)")
+    return result
@@ -1,42 +1,87 @@
-"""Cryptography utilities for encrypting secrets."""
+"""Cryptography utilities for encrypting secrets.
+
+``cryptography`` is imported on first use, not at app startup.
+"""
+import hashlib
+import hmac
 import os
+import threading
+from typing import TYPE_CHECKING
 
 import yaml
-from cryptography.fernet import Fernet
 from flask import current_app
 
+if TYPE_CHECKING:
+    from cryptography.fernet import MultiFernet
+
 # Default paths and key names
 HA_SECRETS_PATH = '/config/secrets.yaml'
 DEFAULT_FERNET_KEY_NAME = 'octodns_fernet_key'
+# Derives the digest key, so the Fernet key itself is never used as an HMAC key
+DIGEST_KEY_CONTEXT = b'octodns-gui config digest'
 
 
-def _load_key_from_ha_secrets() -> bytes | None:
-    """Load Fernet key from Home Assistant secrets.yaml.
+def _to_bytes(key) -> bytes:
+    return key.encode() if isinstance(key, str) else key
 
-    Returns:
-        Fernet key as bytes, or None if not found.
-    """
+
+def _split_keys(value) -> list[bytes]:
+    """Normalize a key list (comma-separated string or YAML list) to bytes."""
+    if not value:
+        return []
+    if isinstance(value, (str, bytes)):
+        value = _to_bytes(value).split(b',')
+    return [_to_bytes(k).strip() for k in value if k and _to_bytes(k).strip()]
+
+
+def _read_ha_secrets() -> dict | None:
+    """Read Home Assistant secrets.yaml, or None if missing/unreadable."""
     secrets_path = current_app.config.get('HA_SECRETS_PATH', HA_SECRETS_PATH)
-    key_name = current_app.config.get('FERNET_KEY_NAME', DEFAULT_FERNET_KEY_NAME)
 
     if not os.path.exists(secrets_path):
         return None
 
     try:
         with open(secrets_path, 'r', encoding='utf-8') as f:
-            secrets = yaml.safe_load(f)
-
-        if secrets and key_name in secrets:
-            key = secrets[key_name]
-            if isinstance(key, str):
-                return key.encode()
-            return key
+            return yaml.safe_load(f) or {}
     except Exception as e:
         current_app.logger.warning(f"Failed to load Fernet key from secrets.yaml: {e}")
 
     return None
 
 
+def _load_key_from_ha_secrets() -> bytes | None:
+    """Load Fernet key from Home Assistant secrets.yaml.
+
+    Returns:
+        Fernet key as bytes, or None if not found.
+    """
+    key_name = current_app.config.get('FERNET_KEY_NAME', DEFAULT_FERNET_KEY_NAME)
+    secrets = _read_ha_secrets()
+
+    if secrets and key_name in secrets:
+        return _to_bytes(secrets[key_name])
+
+    return None
+
+
+def get_old_fernet_keys() -> list[bytes]:
+    """Get retired Fernet keys that may still be used for decryption.
+
+    Sources (both are merged):
+    1. FERNET_OLD_KEYS environment variable / config (comma-separated)
+    2. Home Assistant secrets.yaml (key: octodns_fernet_key_old, string or list)
+    """
+    keys = _split_keys(current_app.config.get('FERNET_OLD_KEYS'))
+
+    key_name = current_app.config.get('FERNET_KEY_NAME', DEFAULT_FERNET_KEY_NAME)
+    secrets = _read_ha_secrets()
+    if secrets:
+        keys.extend(_split_keys(secrets.get(f'{key_name}_old')))
+
+    return keys
+
+
 def get_fernet_key() -> bytes:
     """Get or generate the Fernet encryption key.
 
@@ -67,6 +112,7 @@ def get_fernet_key() -> bytes:
             return f.read()
 
     # Generate new key
+    from cryptography.fernet import Fernet
     key = Fernet.generate_key()
     os.makedirs(os.path.dirname(key_file), exist_ok=True)
     with open(key_file, 'wb') as f:
@@ -83,16 +129,112 @@ def generate_fernet_key() -> str:
     Returns:
         Base64-encoded Fernet key as string (suitable for secrets.yaml).
     """
+    from cryptography.fernet import Fernet
     return Fernet.generate_key().decode()
 
 
+def _stat_signature(path: str) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _key_source_token() -> tuple:
+    """Cheap fingerprint of everything the key resolution depends on.
+
+    Only config values and stat() results are used, so the token can be
+    computed on every call without reading any key material.
+    """
+    config = current_app.config
+    secrets_path = config.get('HA_SECRETS_PATH', HA_SECRETS_PATH)
+    zone_path = config.get('ZONE_FILE_PATH', '/config/octodns')
+    key_file = os.path.join(zone_path, '.fernet_key')
+    return (
+        config.get('FERNET_KEY'),
+        config.get('FERNET_OLD_KEYS'),
+        config.get('FERNET_KEY_NAME', DEFAULT_FERNET_KEY_NAME),
+        secrets_path,
+        _stat_signature(secrets_path),
+        key_file,
+        _stat_signature(key_file),
+    )
+
+
+class _CipherCache:
+    """Process-wide cache of the configured MultiFernet cipher."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token = None
+        self._cipher = None
+        self._digest_key = None
+
+    def get(self) -> 'MultiFernet':
+        token = _key_source_token()
+        cipher = self._cipher
+        if cipher is not None and token == self._token:
+            return cipher
+
+        with self._lock:
+            if self._cipher is not None and token == self._token:
+                return self._cipher
+
+            from cryptography.fernet import Fernet, MultiFernet
+
+            primary = get_fernet_key()
+            keys = [primary] + [k for k in get_old_fernet_keys() if k != primary]
+            cipher = MultiFernet([Fernet(k) for k in keys])
+
+            # Key generation may have created .fernet_key, so re-read the token
+            self._token = _key_source_token()
+            self._cipher = cipher
+            self._digest_key = hmac.new(primary, DIGEST_KEY_CONTEXT, hashlib.sha256).digest()
+            return cipher
+
+    def digest_key(self) -> bytes:
+        self.get()
+        return self._digest_key
+
+    def clear(self):
+        with self._lock:
+            self._token = None
+            self._cipher = None
+            self._digest_key = None
+
+
+_cipher_cache = _CipherCache()
+
+
+def get_cipher() -> 'MultiFernet':
+    """Get the cached cipher (primary key first, then retired keys)."""
+    return _cipher_cache.get()
+
+
+def get_digest_key() -> bytes:
+    """Key for HMACs over data that contains secrets (derived from the primary key)."""
+    return _cipher_cache.digest_key()
+
+
+def clear_cipher_cache():
+    """Drop the cached cipher so the next call resolves keys again."""
+    _cipher_cache.clear()
+
+
 def encrypt_value(plaintext: str) -> bytes:
-    """Encrypt a plaintext string."""
-    fernet = Fernet(get_fernet_key())
-    return fernet.encrypt(plaintext.encode())
+    """Encrypt a plaintext string with the primary key."""
+    return get_cipher().encrypt(plaintext.encode())
 
 
 def decrypt_value(ciphertext: bytes) -> str:
-    """Decrypt a ciphertext to string."""
-    fernet = Fernet(get_fernet_key())
-    return fernet.decrypt(ciphertext).decode()
+    """Decrypt a ciphertext to string, trying the primary key first."""
+    return get_cipher().decrypt(ciphertext).decode()
+
+
+def rotate_value(ciphertext: bytes) -> bytes:
+    """Re-encrypt a ciphertext with the primary key.
+
+    Works for values encrypted with any retired key.
+    """
+    return get_cipher().rotate(ciphertext)
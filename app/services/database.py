@@ -0,0 +1,142 @@
+"""Database engine tuning.
+
+Builds SQLALCHEMY_ENGINE_OPTIONS for the configured backend and applies
+SQLite pragmas on every new connection. Background sync jobs write while
+the UI reads, so SQLite runs in WAL mode with a busy timeout instead of
+failing with "database is locked".
+
+Values come from the addon options (db_* / sqlite_* keys), then
+environment variables, then the defaults below.
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from extensions import db
+from services.options_service import get_options
+
+SQLITE_DEFAULTS = {
+    'sqlite_wal': True,
+    'sqlite_synchronous': 'NORMAL',
+    'sqlite_mmap_size_mb': 64,
+    'sqlite_cache_size_mb': 8,
+    'db_busy_timeout': 5000,  # ms
+    'db_pool_size': 5,
+    'db_max_overflow': 10,
+}
+
+MARIADB_DEFAULTS = {
+    'db_pool_size': 5,
+    'db_max_overflow': 10,
+    'db_pool_recycle': 1800,  # s, below MariaDB's wait_timeout
+    'db_pool_timeout': 30,
+}
+
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def _setting(name: str, defaults: dict):
+    """Look up a tuning value: addon option, then env var, then default."""
+    value = get_options().get(name)
+    if value is None:
+        value = os.environ.get(name.upper())
+    if value is None:
+        return defaults.get(name)
+
+    default = defaults.get(name)
+    if isinstance(default, bool):
+        return value if isinstance(value, bool) else str(value).lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        return int(value)
+    return value
+
+
+def is_sqlite(uri: str) -> bool:
+    return (uri or '').startswith('sqlite')
+
+
+def is_memory_sqlite(uri: str) -> bool:
+    """In-memory SQLite, which SQLAlchemy serves from a SingletonThreadPool."""
+    return is_sqlite(uri) and make_url(uri).database in (None, '', ':memory:')
+
+
+def build_engine_options(uri: str) -> dict:
+    """Build SQLAlchemy engine options for a database URI."""
+    if is_sqlite(uri):
+        defaults = SQLITE_DEFAULTS
+        options = {
+            'connect_args': {
+                # sqlite3 waits this long for locks before raising
+                'timeout': _setting('db_busy_timeout', defaults) / 1000,
+                'check_same_thread': False,
+            },
+        }
+        # SingletonThreadPool has no overflow; sizing it makes no sense
+        if not is_memory_sqlite(uri):
+            options['pool_size'] = _setting('db_pool_size', defaults)
+            options['max_overflow'] = _setting('db_max_overflow', defaults)
+        return options
+
+    defaults = MARIADB_DEFAULTS
+    return {
+        'pool_size': _setting('db_pool_size', defaults),
+        'max_overflow': _setting('db_max_overflow', defaults),
+        'pool_recycle': _setting('db_pool_recycle', defaults),
+        'pool_timeout': _setting('db_pool_timeout', defaults),
+        'pool_pre_ping': True,
+    }
+
+
+def sqlite_pragmas() -> dict:
+    """Pragmas applied to every new SQLite connection."""
+    defaults = SQLITE_DEFAULTS
+    synchronous = str(_setting('sqlite_synchronous', defaults)).upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        synchronous = defaults['sqlite_synchronous']
+
+    pragmas = {
+        'busy_timeout': _setting('db_busy_timeout', defaults),
+        'synchronous': synchronous,
+        'mmap_size': _setting('sqlite_mmap_size_mb', defaults) * 1024 * 1024,
+        # Negative values are KiB
+        'cache_size': -_setting('sqlite_cache_size_mb', defaults) * 1024,
+        'temp_store': 'MEMORY',
+        # SQLite ignores ON DELETE CASCADE (sync_changes, zone_sync_states,
+        # zone_index_entries) unless foreign keys are enabled per connection
+        'foreign_keys': 'ON',
+    }
+    if _setting('sqlite_wal', defaults):
+        pragmas = {'journal_mode': 'WAL', **pragmas}
+    return pragmas
+
+
+def configure_engine_options(app):
+    """Set SQLALCHEMY_ENGINE_OPTIONS; call before db.init_app().
+
+    Explicitly configured options win over the computed ones.
+    """
+    options = build_engine_options(app.config.get('SQLALCHEMY_DATABASE_URI', ''))
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def install_sqlite_pragmas(app):
+    """Apply SQLite pragmas on connect; call after db.init_app()."""
+    if not is_sqlite(app.config.get('SQLALCHEMY_DATABASE_URI', '')):
+        return
+
+    pragmas = sqlite_pragmas()
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', on_connect)
+
+    app.logger.debug(f"SQLite pragmas: {pragmas}")
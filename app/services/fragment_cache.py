@@ -0,0 +1,63 @@
+"""Rendered HTML fragment cache.
+
+Small in-memory LRU for HTMX partials whose output only depends on a few
+known inputs. Callers build a version token from those inputs (see
+make_token); the same token is used as ETag, so a fragment is rendered at
+most once per token and browsers can revalidate with If-None-Match.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def make_token(*parts) -> str:
+    """Build a short, stable version token from the given parts."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:20]
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments keyed by version token."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def init_app(self, app):
+        self.max_entries = int(app.config.get('FRAGMENT_CACHE_SIZE', self.max_entries))
+        app.extensions['fragment_cache'] = self
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(token)
+            if html is not None:
+                self._entries.move_to_end(token)
+            return html
+
+    def get_or_render(self, token: str, render: Callable[[], str]) -> str:
+        """Return the cached fragment for a token, rendering it on a miss."""
+        html = self.get(token)
+        if html is not None:
+            return html
+
+        html = render()
+        with self._lock:
+            self._entries[token] = html
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache()
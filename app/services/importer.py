@@ -0,0 +1,381 @@
+"""Bulk import of an existing octoDNS setup.
+
+Reads an octoDNS config.yaml and creates the Provider, Zone and ZoneTarget
+rows for it. Plain-text secrets in provider configs are moved into
+encrypted EnvVars and replaced by env/ references. Zones are inserted in
+batches of ``batch_size`` rows per transaction.
+
+Zone files of YamlProvider sources can be copied from a zones directory
+into the GUI's zone directory. Each file is checked with the event-based
+YAML parser before it is copied, so even a very large zone is never held
+in memory as a whole.
+"""
+import logging
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from typing import Optional
+
+import yaml
+from flask import current_app
+
+from extensions import db
+from models import EnvVar, Provider, Zone, ZoneTarget
+from services.crypto import decrypt_value, encrypt_value
+from services.provider_discovery import SECRET_HINTS
+from services.provider_service import ENV_REF_PREFIX, get_provider_info
+from services.utils import SafeLoader
+from services.zone_files import zone_file_name, zone_files_dir
+from services.zone_loader import iter_zone_records
+
+YAML_PROVIDER_CLASS = 'octodns.provider.yaml.YamlProvider'
+DEFAULT_BATCH_SIZE = 200
+
+_ENV_KEY_INVALID = re.compile(r'[^A-Z0-9_]+')
+_ENV_KEY_VALID = re.compile(r'[A-Z0-9_]{1,50}')
+
+
+class ConfigImportError(Exception):
+    """The octoDNS config cannot be imported."""
+
+
+@dataclass
+class ImportReport:
+    """Outcome of an import run."""
+    dry_run: bool
+    providers_created: list[str] = field(default_factory=list)
+    providers_skipped: list[str] = field(default_factory=list)
+    zones_created: int = 0
+    zones_skipped: list[str] = field(default_factory=list)
+    targets_created: int = 0
+    secrets_created: list[str] = field(default_factory=list)
+    secrets_missing: list[str] = field(default_factory=list)
+    zone_files: int = 0
+    records: int = 0
+    warnings: list[str] = field(default_factory=list)
+
+
+def _include_constructor(base_dir: str):
+    """octoDNS' '!include other.yaml' tag, resolved relative to the config."""
+    def construct(loader, node):
+        path = os.path.join(base_dir, loader.construct_scalar(node))
+        with open(path, 'r', encoding='utf-8') as f:
+            return yaml.load(f, Loader=loader.__class__)
+    return construct
+
+
+def load_config(path: str) -> dict:
+    """Parse an octoDNS config file.
+
+    Raises:
+        ConfigImportError: If the file is missing or not an octoDNS config.
+    """
+    loader = type('ConfigLoader', (SafeLoader,), {})
+    loader.add_constructor('!include', _include_constructor(os.path.dirname(path)))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=loader)
+    except OSError as e:
+        raise ConfigImportError(f"Datei kann nicht gelesen werden: {e}")
+    except yaml.YAMLError as e:
+        raise ConfigImportError(f"Ungültiges YAML in {path}: {e}")
+
+    if not isinstance(data, dict) or not isinstance(data.get('providers'), dict):
+        raise ConfigImportError(f"{path} enthält keinen 'providers'-Abschnitt.")
+    if not isinstance(data.get('zones') or {}, dict):
+        raise ConfigImportError(f"'zones' in {path} ist kein Mapping.")
+    return data
+
+
+def scan_zone_file(path: str) -> int:
+    """Validate a YAML zone file and count its record names.
+
+    Uses the zone loader's event parser, so only one record set is in
+    memory at a time regardless of the file size.
+
+    Returns:
+        Number of top-level keys (record names).
+
+    Raises:
+        yaml.YAMLError: If the file is not valid YAML.
+        ValueError: If the top level is not a mapping.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return sum(1 for _ in iter_zone_records(f, strict=True))
+
+
+def env_key(provider_name: str, field_name: str) -> str:
+    """EnvVar key for a provider secret, e.g. CLOUDFLARE_TOKEN."""
+    key = _ENV_KEY_INVALID.sub('_', f'{provider_name}_{field_name}'.upper()).strip('_')
+    return key[:50]
+
+
+def _is_secret_field(field_name: str, secret_fields: set[str]) -> bool:
+    return field_name in secret_fields or any(hint in field_name.lower() for hint in SECRET_HINTS)
+
+
+def _normalize_zone_name(name: str) -> str:
+    name = name.strip().lower()
+    return name if name.endswith('.') else f'{name}.'
+
+
+class OctoDNSImporter:
+    """Imports one octoDNS config into the database.
+
+    Args:
+        config_path: octoDNS config.yaml.
+        zones_dir: Directory with the YamlProvider zone files to copy into
+            the GUI's zone directory, or None to leave zone files alone.
+        zone_files_target: The GUI's zone file directory.
+        batch_size: Zones per transaction.
+        dry_run: Only report what would be imported.
+    """
+
+    def __init__(self, config_path: str, zones_dir: Optional[str], zone_files_target: str,
+                 batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False,
+                 logger: Optional[logging.Logger] = None):
+        self.config_path = config_path
+        self.zones_dir = zones_dir
+        self.zone_files_target = zone_files_target
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.logger = logger or logging.getLogger(__name__)
+        self.report = ImportReport(dry_run=dry_run)
+        # YamlProvider sources whose zone files are copied from zones_dir
+        self._yaml_sources: set[str] = set()
+
+    def run(self) -> ImportReport:
+        config = load_config(self.config_path)
+        zones = {
+            _normalize_zone_name(str(name)): dict(data or {})
+            for name, data in (config.get('zones') or {}).items()
+        }
+
+        source_names = {s for z in zones.values() for s in z.get('sources') or []}
+        target_names = {t for z in zones.values() for t in z.get('targets') or []}
+        provider_ids = self._import_providers(config['providers'], source_names, target_names)
+        self._import_zones(zones, provider_ids)
+
+        if not self.dry_run:
+            from services.config_generator import generate_config
+            generate_config()
+
+        self.logger.info(
+            f"octoDNS import{' (dry-run)' if self.dry_run else ''}: "
+            f"{len(self.report.providers_created)} providers, {self.report.zones_created} zones, "
+            f"{self.report.targets_created} targets, {self.report.zone_files} zone files")
+        return self.report
+
+    # -- Providers ------------------------------------------------------
+
+    def _import_providers(self, providers: dict, source_names: set[str],
+                          target_names: set[str]) -> dict[str, int]:
+        """Create missing providers and their secrets in one transaction.
+
+        YamlProvider sources are pointed at the GUI's zone directory, unless
+        they are also a target: syncing into the directory the sources read
+        from would overwrite the source zone files.
+
+        Returns:
+            Provider name -> id for all providers known after the import
+            (ids are None in a dry-run).
+        """
+        existing = {p.name: p.id for p in Provider.query.with_entities(Provider.name, Provider.id)}
+        env_vars = {e.key: e for e in EnvVar.query}
+        ids = dict(existing)
+
+        for name, data in providers.items():
+            name = str(name)
+            if name in existing:
+                self.report.providers_skipped.append(name)
+                continue
+            if not isinstance(data, dict) or not data.get('class'):
+                self.report.warnings.append(f"Provider '{name}': keine Klasse angegeben, übersprungen.")
+                continue
+            if len(name) > 50:
+                self.report.warnings.append(f"Provider '{name}': Name länger als 50 Zeichen, übersprungen.")
+                continue
+
+            provider_type = data['class']
+            info = get_provider_info(provider_type)
+            if info is None:
+                self.report.warnings.append(
+                    f"Provider '{name}': Typ {provider_type} ist der GUI nicht bekannt, bitte Konfiguration prüfen.")
+            secret_fields = {f['name'] for f in info.fields if f.get('env_ref')} if info else set()
+
+            config = {}
+            if self.zones_dir and provider_type == YAML_PROVIDER_CLASS and name in source_names:
+                if name in target_names:
+                    self.report.warnings.append(
+                        f"Provider '{name}': ist auch Target, Verzeichnis {data.get('directory')} "
+                        f"bleibt erhalten und Zone-Dateien werden nicht kopiert.")
+                else:
+                    # Zone files are copied into the GUI's zone directory
+                    data = {**data, 'directory': self.zone_files_target}
+                    self._yaml_sources.add(name)
+            for key, value in data.items():
+                if key == 'class':
+                    continue
+                config[key] = self._secret_ref(name, key, value, env_vars) \
+                    if _is_secret_field(key, secret_fields) else value
+                self._check_env_ref(config[key], env_vars)
+
+            provider = Provider(name=name, provider_type=provider_type, config_json=config,
+                                is_source=name in source_names)
+            self.report.providers_created.append(name)
+            if not self.dry_run:
+                db.session.add(provider)
+                db.session.flush()
+            ids[name] = provider.id
+
+        if not self.dry_run:
+            db.session.commit()
+        return ids
+
+    def _secret_ref(self, provider_name: str, field_name: str, value, env_vars: dict):
+        """Move a plain-text secret into an EnvVar and return its env/ reference."""
+        if not isinstance(value, str) or not value or value.startswith(ENV_REF_PREFIX):
+            return value
+
+        base = env_key(provider_name, field_name)
+        key, suffix = base, 1
+        while key in env_vars:
+            try:
+                if decrypt_value(env_vars[key].value_encrypted) == value:
+                    return f'{ENV_REF_PREFIX}{key}'
+            except Exception:
+                pass
+            suffix += 1
+            key = f'{base[:47]}_{suffix}'
+
+        env_var = EnvVar(key=key, value_encrypted=encrypt_value(value))
+        env_vars[key] = env_var
+        self.report.secrets_created.append(key)
+        if not self.dry_run:
+            db.session.add(env_var)
+        return f'{ENV_REF_PREFIX}{key}'
+
+    def _check_env_ref(self, value, env_vars: dict):
+        """Take over env/ references from the process environment if possible."""
+        if not isinstance(value, str) or not value.startswith(ENV_REF_PREFIX):
+            return
+        key = value[len(ENV_REF_PREFIX):]
+        if key in env_vars or key in self.report.secrets_missing:
+            return
+        if key in os.environ and _ENV_KEY_VALID.fullmatch(key):
+            env_var = EnvVar(key=key, value_encrypted=encrypt_value(os.environ[key]))
+            env_vars[key] = env_var
+            self.report.secrets_created.append(key)
+            if not self.dry_run:
+                db.session.add(env_var)
+        else:
+            self.report.secrets_missing.append(key)
+
+    # -- Zones ----------------------------------------------------------
+
+    def _import_zones(self, zones: dict[str, dict], provider_ids: dict[str, int]):
+        existing = {name for (name,) in db.session.query(Zone.name)}
+        batch = 0
+
+        for name, data in sorted(zones.items()):
+            if name in existing:
+                self.report.zones_skipped.append(name)
+                continue
+            if name.startswith('*') or data.get('alias'):
+                self.report.warnings.append(
+                    f"Zone '{name}': dynamische Zonen und Aliase werden nicht importiert.")
+                continue
+            if len(name) > 100:
+                self.report.warnings.append(f"Zone '{name}': Name länger als 100 Zeichen, übersprungen.")
+                continue
+
+            sources = data.pop('sources', None) or []
+            targets = data.pop('targets', None) or []
+            unknown = [p for p in [*sources, *targets] if p not in provider_ids]
+            if not sources or unknown:
+                self.report.warnings.append(
+                    f"Zone '{name}': Source fehlt oder unbekannte Provider ({', '.join(unknown) or '-'}).")
+                continue
+            if len(sources) > 1:
+                self.report.warnings.append(
+                    f"Zone '{name}': mehrere Sources, nur '{sources[0]}' wird übernommen.")
+
+            if sources[0] in self._yaml_sources:
+                self._import_zone_file(name)
+
+            self.report.zones_created += 1
+            self.report.targets_created += len(set(targets))
+            if self.dry_run:
+                continue
+
+            zone = Zone(name=name, source_id=provider_ids[sources[0]], options_json=data)
+            zone.targets = [ZoneTarget(target_id=provider_ids[t]) for t in sorted(set(targets))]
+            db.session.add(zone)
+            batch += 1
+            if batch >= self.batch_size:
+                self._commit_batch()
+                batch = 0
+
+        if batch and not self.dry_run:
+            self._commit_batch()
+
+    def _commit_batch(self):
+        db.session.commit()
+        # Drop the committed rows from the identity map to keep memory flat
+        db.session.expunge_all()
+
+    def _import_zone_file(self, zone_name: str):
+        """Check one zone file from zones_dir and copy it to the zone directory."""
+        filename = zone_file_name(zone_name)
+        path = os.path.join(self.zones_dir, filename)
+        if not os.path.isfile(path):
+            self.report.warnings.append(f"Zone '{zone_name}': keine Zone-Datei {filename} gefunden.")
+            return
+        try:
+            records = scan_zone_file(path)
+        except (yaml.YAMLError, ValueError, UnicodeDecodeError) as e:
+            self.report.warnings.append(f"Zone '{zone_name}': {filename} ist ungültig ({e}).")
+            return
+
+        self.report.zone_files += 1
+        self.report.records += records
+        if self.dry_run:
+            return
+
+        destination = os.path.join(self.zone_files_target, filename)
+        if os.path.abspath(destination) == os.path.abspath(path):
+            return
+        if os.path.exists(destination):
+            self.report.warnings.append(
+                f"Zone '{zone_name}': {destination} existiert bereits und wurde nicht überschrieben.")
+            return
+        os.makedirs(self.zone_files_target, exist_ok=True)
+        shutil.copyfile(path, destination)
+
+
+def import_octodns_config(config_path: str, zones_dir: Optional[str] = None,
+                          dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> ImportReport:
+    """Import an octoDNS config.yaml (and zone files) into the database.
+
+    Args:
+        config_path: octoDNS config.yaml.
+        zones_dir: Directory with the zone files of YamlProvider sources.
+        dry_run: Only report what would be imported.
+        batch_size: Zones per transaction.
+
+    Returns:
+        ImportReport.
+
+    Raises:
+        ConfigImportError: If the config cannot be read.
+    """
+    importer = OctoDNSImporter(
+        config_path,
+        zones_dir,
+        zone_files_dir(),
+        batch_size=batch_size,
+        dry_run=dry_run,
+        logger=current_app.logger,
+    )
+    return importer.run()
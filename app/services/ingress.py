@@ -0,0 +1,23 @@
+"""Home Assistant Ingress access restriction.
+
+When the addon port is mapped for webhooks, everything except the webhook
+endpoint must still only be reachable through the Ingress proxy, which
+handles authentication. The check uses the TCP peer address, which
+clients cannot spoof via headers.
+"""
+from flask import abort, request
+
+# Supervisor's Ingress proxy, plus local health checks
+INGRESS_ADDRESSES = ('172.30.32.2', '127.0.0.1', '::1')
+PUBLIC_ENDPOINTS = ('sync.webhook',)
+
+
+def restrict_to_ingress(app):
+    """Reject direct requests to anything but the public endpoints."""
+    allowed = tuple(app.config.get('INGRESS_ADDRESSES', INGRESS_ADDRESSES))
+
+    @app.before_request
+    def _check_ingress():
+        if request.endpoint in PUBLIC_ENDPOINTS or request.remote_addr in allowed:
+            return None
+        abort(403)
@@ -0,0 +1,103 @@
+"""Append-only sync job logs.
+
+Each job writes its output line by line to its own log file instead of
+the SyncJob.output column. Readers only ever load a bounded chunk: the
+tail of the file for the initial page render and new bytes from a given
+offset for live streaming.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+DEFAULT_TAIL_BYTES = 64 * 1024
+DEFAULT_CHUNK_BYTES = 64 * 1024
+
+
+class JobLog:
+    """Per-job log files below a log directory."""
+
+    def __init__(self, log_dir: Optional[str] = None):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the log directory (SYNC_LOG_DIR or <ZONE_FILE_PATH>/logs)."""
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self.log_dir = app.config.get('SYNC_LOG_DIR') or os.path.join(zone_path, 'logs')
+        os.makedirs(self.log_dir, exist_ok=True)
+        app.extensions['job_log'] = self
+
+    def path(self, job_id: int) -> str:
+        return os.path.join(self.log_dir, f'job-{job_id}.log')
+
+    def exists(self, job_id: int) -> bool:
+        return os.path.exists(self.path(job_id))
+
+    def size(self, job_id: int) -> int:
+        try:
+            return os.path.getsize(self.path(job_id))
+        except OSError:
+            return 0
+
+    def append(self, job_id: int, text: str, timestamp: bool = True):
+        """Append one or more lines to a job log."""
+        prefix = f'[{datetime.utcnow():%H:%M:%S}] ' if timestamp else ''
+        lines = ''.join(f'{prefix}{line}\n' for line in text.splitlines() or [''])
+        with self._lock:
+            with open(self.path(job_id), 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+    def read_from(self, job_id: int, offset: int = 0,
+                  max_bytes: int = DEFAULT_CHUNK_BYTES) -> tuple[list[str], int]:
+        """Read complete lines starting at a byte offset.
+
+        Args:
+            job_id: Job id.
+            offset: Byte offset to start reading at.
+            max_bytes: Upper bound for the chunk size.
+
+        Returns:
+            Tuple of (lines, next_offset). A trailing partial line is left
+            for the next call.
+        """
+        try:
+            with open(self.path(job_id), 'rb') as f:
+                f.seek(offset)
+                chunk = f.read(max_bytes)
+        except OSError:
+            return [], offset
+
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            # A single line longer than max_bytes is returned as-is
+            if len(chunk) < max_bytes:
+                return [], offset
+            end = len(chunk) - 1
+        chunk = chunk[:end + 1]
+        lines = chunk.decode('utf-8', errors='replace').splitlines()
+        return lines, offset + len(chunk)
+
+    def tail(self, job_id: int, max_bytes: int = DEFAULT_TAIL_BYTES) -> tuple[str, int, bool]:
+        """Read the end of a job log.
+
+        Returns:
+            Tuple of (text, end_offset, truncated).
+        """
+        size = self.size(job_id)
+        start = max(0, size - max_bytes)
+        try:
+            with open(self.path(job_id), 'rb') as f:
+                f.seek(start)
+                chunk = f.read(size - start)
+        except OSError:
+            return '', 0, False
+
+        if start > 0:
+            # Drop the partial first line
+            newline = chunk.find(b'\n')
+            chunk = chunk[newline + 1:] if newline >= 0 else b''
+        return chunk.decode('utf-8', errors='replace'), size, start > 0
+
+
+job_log = JobLog()
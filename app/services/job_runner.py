@@ -0,0 +1,315 @@
+"""Background sync job runner.
+
+The sync_jobs table is the queue: jobs are inserted as 'pending' and a
+dispatcher thread claims them with an atomic status update, then runs them
+in a bounded thread pool off the request thread. Jobs that touch a target
+provider which is already at its concurrency limit stay queued until a
+slot frees up. Jobs left 'running' by a crash are re-queued on startup.
+
+Job output goes to the append-only per-job log (services.job_log).
+
+With several WSGI worker processes every process starts a runner, but
+only the one holding the runner lock file dispatches jobs. The others
+stand by and take over if that process exits; jobs enqueued by a standby
+process are picked up on the leader's next poll.
+"""
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+
+from extensions import db
+from models import SyncJob, Zone, ZoneTarget
+from services.job_log import job_log
+from services.options_service import get_options
+from services.process_lock import FileLock
+from services.source_cache import source_cache
+from services.sync_changes import store_changes
+from services.sync_engine import DEFAULT_MAX_WORKERS as DEFAULT_ENGINE_WORKERS, SyncEngine
+from services.sync_state import DEFAULT_VERIFY_INTERVAL_HOURS, save_states
+from services.validation import validator
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_SUCCESS = 'success'
+STATUS_FAILED = 'failed'
+
+DEFAULT_WORKERS = 2
+DEFAULT_PER_TARGET_CONCURRENCY = 1
+DEFAULT_POLL_INTERVAL = 5.0
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+class JobRunner:
+    """Runs queued SyncJobs in a bounded worker pool."""
+
+    def __init__(self):
+        self.app = None
+        self.max_workers = DEFAULT_WORKERS
+        self.per_target_concurrency = DEFAULT_PER_TARGET_CONCURRENCY
+        self.poll_interval = DEFAULT_POLL_INTERVAL
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._busy_targets: Counter = Counter()
+        self._leader_lock: Optional[FileLock] = None
+        self._ticks: list[Callable[[], None]] = []
+
+    def init_app(self, app, start: bool = True):
+        """Configure the runner from the app config and optionally start it."""
+        self.app = app
+        self.max_workers = int(app.config.get('SYNC_WORKERS', DEFAULT_WORKERS))
+        self.per_target_concurrency = int(app.config.get(
+            'SYNC_PER_TARGET_CONCURRENCY', DEFAULT_PER_TARGET_CONCURRENCY))
+        self.poll_interval = float(app.config.get('SYNC_POLL_INTERVAL', DEFAULT_POLL_INTERVAL))
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self._leader_lock = FileLock(app.config.get('SYNC_RUNNER_LOCK_PATH')
+                                     or os.path.join(zone_path, '.sync-runner.lock'))
+        app.extensions['job_runner'] = self
+        if start:
+            self.start()
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    @property
+    def is_leader(self) -> bool:
+        """True if this process dispatches sync jobs."""
+        return self._leader_lock is not None and self._leader_lock.locked
+
+    def start(self):
+        """Start the dispatcher thread.
+
+        Interrupted jobs are recovered once this process becomes the leader.
+        """
+        if self.running:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='sync-job')
+        self._dispatcher = threading.Thread(target=self._dispatch_loop,
+                                            name='sync-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def stop(self, wait: bool = True):
+        """Stop dispatching; running jobs finish if wait is True."""
+        self._stop.set()
+        self._wake.set()
+        if self._dispatcher:
+            self._dispatcher.join(timeout=self.poll_interval + 1)
+            self._dispatcher = None
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._leader_lock:
+            self._leader_lock.release()
+
+    def add_tick(self, callback: Callable[[], None]):
+        """Call a function on every dispatcher poll of the leader process.
+
+        Runs inside an app context, e.g. for the sync scheduler.
+        """
+        self._ticks.append(callback)
+
+    def wake(self):
+        """Make the dispatcher poll now instead of after the poll interval."""
+        self._wake.set()
+
+    def _acquire_leadership(self) -> bool:
+        """Try to become the process that dispatches jobs."""
+        if self.is_leader:
+            return True
+        if not self._leader_lock.acquire(blocking=False):
+            return False
+        self.app.logger.info(f"Sync job runner active in process {os.getpid()}")
+        with self.app.app_context():
+            self.recover()
+        return True
+
+    def recover(self) -> int:
+        """Re-queue jobs left 'running' by a crashed process.
+
+        Returns:
+            Number of recovered jobs.
+        """
+        jobs = SyncJob.query.filter_by(status=STATUS_RUNNING).all()
+        for job in jobs:
+            job.status = STATUS_PENDING
+            job.started_at = None
+            job_log.append(job.id, 'Job interrupted, re-queued after restart')
+        if jobs:
+            db.session.commit()
+            self.app.logger.warning(f"Re-queued {len(jobs)} interrupted sync job(s)")
+        return len(jobs)
+
+    def enqueue(self, trigger_type: str = 'manual', dry_run: bool = False,
+                zones: Optional[list[str]] = None, full_sync: bool = False,
+                run_after: Optional[datetime] = None) -> SyncJob:
+        """Queue a new sync job.
+
+        Args:
+            trigger_type: 'manual', 'webhook', 'schedule'
+            dry_run: Plan only, do not apply changes.
+            zones: Zone names to sync, or None for all zones.
+            full_sync: Plan every target, even unchanged ones.
+            run_after: Do not start the job before this time (UTC).
+
+        Returns:
+            The persisted SyncJob.
+        """
+        scope = {}
+        if zones:
+            scope['zones'] = sorted(zones)
+        if full_sync:
+            scope['full'] = True
+        job = SyncJob(
+            status=STATUS_PENDING,
+            trigger_type=trigger_type,
+            dry_run=dry_run,
+            scope_json=scope or None,
+            run_after=run_after,
+        )
+        db.session.add(job)
+        db.session.commit()
+        self._wake.set()
+        return job
+
+    def _job_targets(self, job: SyncJob) -> set[int]:
+        """Get the target provider ids a job will write to."""
+        query = db.session.query(ZoneTarget.target_id).join(Zone, ZoneTarget.zone_id == Zone.id)
+        if job.zone_names:
+            query = query.filter(Zone.name.in_(job.zone_names))
+        return {target_id for (target_id,) in query.distinct()}
+
+    def _claim(self, job_id: int) -> bool:
+        """Atomically move a job from pending to running."""
+        updated = SyncJob.query.filter_by(id=job_id, status=STATUS_PENDING).update(
+            {'status': STATUS_RUNNING, 'started_at': _utcnow()},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return updated == 1
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            try:
+                if self._acquire_leadership():
+                    self._run_ticks()
+                    with self.app.app_context():
+                        self._dispatch_pending()
+            except Exception as e:
+                self.app.logger.error(f"Sync dispatcher error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _run_ticks(self):
+        """Call the tick callbacks; one failing tick must not block the others or dispatching."""
+        for tick in self._ticks:
+            try:
+                with self.app.app_context():
+                    tick()
+            except Exception:
+                self.app.logger.exception(f"Sync dispatcher tick {getattr(tick, '__qualname__', tick)} failed")
+
+    def _dispatch_pending(self):
+        pending = SyncJob.query.filter_by(status=STATUS_PENDING) \
+            .filter(or_(SyncJob.run_after.is_(None), SyncJob.run_after <= _utcnow())) \
+            .order_by(SyncJob.created_at, SyncJob.id).all()
+
+        for job in pending:
+            with self._lock:
+                if self._active >= self.max_workers:
+                    return
+                targets = self._job_targets(job)
+                if any(self._busy_targets[t] >= self.per_target_concurrency for t in targets):
+                    continue
+                if not self._claim(job.id):
+                    continue
+                self._active += 1
+                self._busy_targets.update(targets)
+            self._executor.submit(self._run, job.id, targets)
+
+    def _run(self, job_id: int, targets: set[int]):
+        try:
+            with self.app.app_context():
+                job = db.session.get(SyncJob, job_id)
+                job_log.append(job_id, f"Job started ({'dry-run' if job.dry_run else 'apply'})")
+                try:
+                    success = self.execute(job, lambda line: job_log.append(job_id, line))
+                except Exception as e:
+                    success = False
+                    job_log.append(job_id, f'Sync failed: {e}')
+                    self.app.logger.exception(f"Sync job {job_id} failed")
+                job.status = STATUS_SUCCESS if success else STATUS_FAILED
+                job.finished_at = _utcnow()
+                db.session.commit()
+                job_log.append(job_id, f'Job finished: {job.status}')
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._busy_targets.subtract(targets)
+                self._busy_targets += Counter()  # drop zero counts
+            self._wake.set()
+
+    def verify_interval(self) -> timedelta:
+        """How long an unchanged, in-sync target may be skipped (0 = never skip)."""
+        hours = get_options().get('sync_verify_interval_hours')
+        if hours is None:
+            hours = self.app.config.get('SYNC_VERIFY_INTERVAL_HOURS', DEFAULT_VERIFY_INTERVAL_HOURS)
+        return timedelta(hours=float(hours))
+
+    def execute(self, job: SyncJob, log: Callable[[str], None]) -> bool:
+        """Run the sync engine for a job.
+
+        Args:
+            job: The claimed job.
+            log: Callback receiving output lines as they are produced.
+
+        Returns:
+            True on success.
+        """
+        report = validator.validate(job.zone_names)
+        if not report.ok:
+            # Never start a sync octoDNS would abort halfway through
+            lines = report.error_lines()
+            log(f'Validation failed: {report.errors} error(s), sync not started')
+            for line in lines:
+                log(line)
+            job.diff_json = {'errors': [{'error': line} for line in lines],
+                             'validation': report.to_dict()}
+            return False
+
+        if job.full_sync:
+            log('Full sync: planning all targets')
+        engine = SyncEngine.for_zones(
+            job.zone_names,
+            dry_run=job.dry_run,
+            max_workers=int(self.app.config.get('SYNC_ENGINE_WORKERS', DEFAULT_ENGINE_WORKERS)),
+            log=log,
+            full_sync=job.full_sync,
+            verify_interval=self.verify_interval(),
+            source_cache=source_cache,
+            # Only dry-runs may work on a slightly stale source
+            use_cached_sources=job.dry_run and not job.full_sync,
+        )
+        result = engine.run()
+        store_changes(job.id, result.results)
+        save_states(job.id, result.results, job.dry_run)
+        job.diff_json = result.to_diff()
+        for error in result.errors:
+            log(error)
+        return result.success
+
+
+job_runner = JobRunner()
@@ -0,0 +1,148 @@
+"""Lightweight versioned schema migrations.
+
+db.create_all() only creates missing tables; it never adds columns or
+indexes to existing ones. Migrations listed in MIGRATIONS run once, in
+order, at startup and are recorded in the schema_migrations table. Every
+step checks the live schema first, so migrations are also safe on fresh
+databases where create_all() already created everything.
+
+To add a migration, append a (version, description, function) tuple. The
+function receives an open connection inside a transaction.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import (
+    SchemaMigration, SyncJob, Zone, ZoneIndexEntry, ZoneIndexFile, ZoneSyncState, ZoneTarget,
+)
+
+
+def _quote(conn, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def add_column(conn, column) -> bool:
+    """Add a model column to its existing table if it is missing.
+
+    Args:
+        conn: Open connection.
+        column: Mapped column, e.g. SyncJob.__table__.c.scope_json
+
+    Returns:
+        True if the column was added.
+    """
+    table = column.table.name
+    existing = {c['name'] for c in inspect(conn).get_columns(table)}
+    if column.name in existing:
+        return False
+
+    type_sql = column.type.compile(dialect=conn.dialect)
+    conn.execute(text(
+        f'ALTER TABLE {_quote(conn, table)} ADD COLUMN {_quote(conn, column.name)} {type_sql}'
+    ))
+    return True
+
+
+def create_index(conn, table, name: str) -> bool:
+    """Create a model-defined index if it does not exist yet.
+
+    Args:
+        conn: Open connection.
+        table: SQLAlchemy Table that defines the index.
+        name: Index name.
+
+    Returns:
+        True if the index was created.
+    """
+    existing = {i['name'] for i in inspect(conn).get_indexes(table.name)}
+    if name in existing:
+        return False
+
+    index = next(i for i in table.indexes if i.name == name)
+    index.create(conn)
+    return True
+
+
+def _add_sync_job_scope(conn):
+    add_column(conn, SyncJob.__table__.c.scope_json)
+
+
+def _add_lookup_indexes(conn):
+    create_index(conn, SyncJob.__table__, 'ix_sync_jobs_created_at')
+    create_index(conn, SyncJob.__table__, 'ix_sync_jobs_status_created_at')
+    create_index(conn, Zone.__table__, 'ix_zones_source_id')
+    create_index(conn, ZoneTarget.__table__, 'ix_zone_targets_zone_id')
+    create_index(conn, ZoneTarget.__table__, 'ix_zone_targets_target_id')
+
+
+def _add_zone_sync_states(conn):
+    ZoneSyncState.__table__.create(conn, checkfirst=True)
+
+
+def _add_sync_job_run_after(conn):
+    add_column(conn, SyncJob.__table__.c.run_after)
+
+
+def _add_zone_index(conn):
+    ZoneIndexFile.__table__.create(conn, checkfirst=True)
+    ZoneIndexEntry.__table__.create(conn, checkfirst=True)
+
+
+def _binary_index_terms(conn):
+    # SQLite compares code points already; MariaDB tables got the default _ci collation
+    if conn.dialect.name not in ('mysql', 'mariadb'):
+        return
+    column = ZoneIndexEntry.__table__.c.term
+    conn.execute(text(
+        f'ALTER TABLE {_quote(conn, column.table.name)} MODIFY {_quote(conn, column.name)} '
+        f'{column.type.compile(dialect=conn.dialect)} NOT NULL'
+    ))
+
+
+def _clear_unkeyed_config_hashes(conn):
+    # Plain SHA-256 of configs with secrets; the next sync stores keyed hashes
+    conn.execute(update(ZoneSyncState.__table__).values(config_hash=None))
+
+
+MIGRATIONS = [
+    (1, 'Add sync_jobs.scope_json', _add_sync_job_scope),
+    (2, 'Add indexes for dashboard, job queue and zone target lookups', _add_lookup_indexes),
+    (3, 'Add zone_sync_states for incremental syncs', _add_zone_sync_states),
+    (4, 'Add sync_jobs.run_after for debounced triggers', _add_sync_job_run_after),
+    (5, 'Add zone_index_files and zone_index_entries for zone search', _add_zone_index),
+    (6, 'Clear unkeyed zone_sync_states.config_hash values', _clear_unkeyed_config_hashes),
+    (7, 'Use a binary collation for zone_index_entries.term', _binary_index_terms),
+]
+
+
+def run_migrations(logger=None) -> list[int]:
+    """Apply all pending migrations.
+
+    Must run inside an app context, after db.create_all().
+
+    Returns:
+        Versions applied by this call.
+    """
+    applied_now = []
+    with db.engine.connect() as conn:
+        applied = set(conn.execute(select(SchemaMigration.version)).scalars())
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with db.engine.begin() as conn:
+                migrate(conn)
+                conn.execute(insert(SchemaMigration).values(
+                    version=version, description=description, applied_at=datetime.utcnow()))
+        except IntegrityError:
+            # Another process recorded this version first
+            continue
+        applied_now.append(version)
+        if logger:
+            logger.info(f"Applied schema migration {version}: {description}")
+
+    return applied_now
@@ -0,0 +1,152 @@
+"""Home Assistant addon options.
+
+Loads /data/options.json (or the local addon_options.yaml used during
+development) once and exposes it as an immutable snapshot. The file is
+re-stat'ed at most every few seconds and only re-parsed when it changed.
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
+
+import yaml
+
+from services.utils import freeze
+
+HA_OPTIONS_PATH = '/data/options.json'
+DEV_OPTIONS_FILENAME = 'addon_options.yaml'
+DEFAULT_CHECK_INTERVAL = 5.0
+
+
+@dataclass(frozen=True)
+class AddonOptions:
+    """Read-only snapshot of the addon options."""
+    providers: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    zone_file_path: Optional[str] = None
+    raw: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    source: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict, source: Optional[str] = None) -> 'AddonOptions':
+        data = data or {}
+        providers = {
+            name: bool(enabled)
+            for name, enabled in (data.get('providers') or {}).items()
+        }
+        return cls(
+            providers=MappingProxyType(providers),
+            zone_file_path=data.get('zone_file_path'),
+            raw=freeze(data),
+            source=source,
+        )
+
+    def is_provider_enabled(self, short_name: str) -> bool:
+        """Check whether a provider is enabled.
+
+        If no provider options exist at all, every provider counts as enabled.
+        """
+        if not self.providers:
+            return True
+        return self.providers.get(short_name, True)
+
+    def get(self, key: str, default=None):
+        """Get a top-level option value."""
+        return self.raw.get(key, default)
+
+    def section(self, key: str) -> MappingProxyType:
+        """Get a nested option mapping (empty if missing)."""
+        value = self.raw.get(key)
+        return value if isinstance(value, MappingProxyType) else MappingProxyType({})
+
+
+def _signature(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class OptionsService:
+    """Memoized reader for the addon options."""
+
+    def __init__(self, ha_options_path: str = HA_OPTIONS_PATH,
+                 dev_options_path: Optional[str] = None,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.ha_options_path = Path(ha_options_path)
+        self.dev_options_path = Path(dev_options_path) if dev_options_path else None
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._snapshot = AddonOptions()
+        self._signature = None
+        self._last_check = None
+
+    def init_app(self, app):
+        """Configure paths from the app config and load the options."""
+        self.ha_options_path = Path(app.config.get('ADDON_OPTIONS_PATH', HA_OPTIONS_PATH))
+        zone_path = app.config.get('ZONE_FILE_PATH', './zones')
+        self.dev_options_path = Path(zone_path) / DEV_OPTIONS_FILENAME
+        self.check_interval = app.config.get('OPTIONS_CHECK_INTERVAL', self.check_interval)
+        self.logger = app.logger
+        self.get(force=True)
+        app.extensions['addon_options'] = self
+
+    def _current_source(self) -> tuple[Optional[Path], Optional[tuple]]:
+        for path in (self.ha_options_path, self.dev_options_path):
+            if path is None:
+                continue
+            sig = _signature(path)
+            if sig is not None:
+                return path, sig
+        return None, None
+
+    def get(self, force: bool = False) -> AddonOptions:
+        """Get the current options snapshot.
+
+        Args:
+            force: Ignore the check interval and stat the files now.
+        """
+        now = time.monotonic()
+        if not force and self._last_check is not None and \
+                now - self._last_check < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            self._last_check = now
+            path, sig = self._current_source()
+            signature = (str(path), sig) if path else None
+            if signature == self._signature and not force:
+                return self._snapshot
+
+            self._snapshot = self._load(path)
+            self._signature = signature
+            return self._snapshot
+
+    def _load(self, path: Optional[Path]) -> AddonOptions:
+        if path is None:
+            # Default: no options, all providers enabled
+            return AddonOptions()
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if path.suffix == '.json':
+                    data = json.load(f)
+                else:
+                    data = yaml.safe_load(f)
+            return AddonOptions.from_dict(data, source=str(path))
+        except Exception as e:
+            self.logger.warning(f"Failed to load addon options from {path}: {e}")
+            return self._snapshot
+
+
+addon_options = OptionsService()
+
+
+def get_options() -> AddonOptions:
+    """Shortcut for ``addon_options.get()``."""
+    return addon_options.get()
@@ -0,0 +1,101 @@
+"""Installed octoDNS package index.
+
+Scans the installed distributions once at startup and keeps a normalized
+name -> version index of octodns and all octodns-* packages. The set only
+changes when the addon image is rebuilt, so there is no invalidation.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from importlib.metadata import distributions
+from typing import Optional
+
+PACKAGE_PREFIX = 'octodns'
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a distribution name (PEP 503).
+
+    e.g. 'OctoDNS_Netbox.DNS' -> 'octodns-netbox-dns'
+    """
+    return re.sub(r'[-_.]+', '-', name or '').lower()
+
+
+def package_name_from_git(url: Optional[str]) -> str:
+    """Derive a package name from a git URL.
+
+    e.g. 'https://github.com/jvoss/octodns-pihole.git' -> 'octodns-pihole'
+    """
+    if not url:
+        return ''
+    name = url.rstrip('/').rsplit('/', 1)[-1]
+    if name.endswith('.git'):
+        name = name[:-4]
+    return normalize_name(name)
+
+
+@dataclass(frozen=True)
+class PackageInfo:
+    """An installed octoDNS related distribution."""
+    name: str
+    version: str
+    summary: str
+    location: Optional[str]
+
+
+class PackageIndex:
+    """Name -> version index built from a single distributions() scan."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._packages: dict[str, PackageInfo] = {}
+        self._scanned = False
+
+    def init_app(self, app):
+        """Scan installed packages and register the index on the app."""
+        self.scan()
+        app.extensions['package_index'] = self
+        app.logger.debug(f"Indexed {len(self._packages)} octoDNS packages")
+
+    def scan(self):
+        """Scan all installed distributions."""
+        packages = {}
+        for dist in distributions():
+            metadata = dist.metadata
+            name = normalize_name(metadata.get('Name', ''))
+            if name != PACKAGE_PREFIX and not name.startswith(f'{PACKAGE_PREFIX}-'):
+                continue
+            # Keep the first hit, like importlib.metadata.version() does
+            if name in packages:
+                continue
+            location = dist.locate_file('')
+            packages[name] = PackageInfo(
+                name=name,
+                version=dist.version,
+                summary=metadata.get('Summary', '') or '',
+                location=str(location) if location else None,
+            )
+
+        with self._lock:
+            self._packages = dict(sorted(packages.items()))
+            self._scanned = True
+
+    def _ensure_scanned(self):
+        if not self._scanned:
+            self.scan()
+
+    def version(self, package_name: str) -> Optional[str]:
+        """Get the installed version of a package, or None if missing."""
+        if not package_name:
+            return None
+        self._ensure_scanned()
+        info = self._packages.get(normalize_name(package_name))
+        return info.version if info else None
+
+    def all(self) -> list[PackageInfo]:
+        """Get all indexed packages, sorted by name."""
+        self._ensure_scanned()
+        return list(self._packages.values())
+
+
+package_index = PackageIndex()
@@ -0,0 +1,70 @@
+"""Inter-process file locks.
+
+Used when the app runs in several WSGI worker processes: startup tasks
+must run once and only one process may dispatch sync jobs. The lock is an
+advisory flock() on a file below the zone directory and is released by
+the OS when the holding process dies.
+"""
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev setups run single-process
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive advisory lock on a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock.
+
+        Args:
+            blocking: Wait until the lock is free instead of failing.
+
+        Returns:
+            True if this process now holds the lock.
+        """
+        if self._fd is not None:
+            return True
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is None:
+            self._fd = fd
+            return True
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
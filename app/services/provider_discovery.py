@@ -0,0 +1,326 @@
+"""Provider discovery.
+
+Finds provider classes in the installed octodns-* distributions and
+introspects their constructor parameters and SUPPORTS record types. The
+result is persisted as JSON and reused until the installed package set
+changes, so provider modules are only imported when that happens, and
+then in the background by the sync dispatcher thread (never at app
+startup and, unless a page needs it first, never in a request).
+
+Classes are taken from the ``octodns.providers`` entry point group if a
+distribution declares it, otherwise from the public classes of its
+top-level modules that derive from octoDNS' BaseSource.
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from importlib.metadata import distributions
+from types import MappingProxyType
+from typing import Optional
+
+from services.package_index import PACKAGE_PREFIX, normalize_name, package_index
+from services.utils import write_atomic
+
+ENTRY_POINT_GROUP = 'octodns.providers'
+# Bump when the descriptor layout changes to force a rebuild
+INDEX_FORMAT = 1
+INDEX_FILENAME = 'provider_index.json'
+
+SUPPORT_FLAGS = ('SUPPORTS_GEO', 'SUPPORTS_DYNAMIC', 'SUPPORTS_ROOT_NS', 'SUPPORTS_MULTIVALUE_PTR')
+SECRET_HINTS = ('token', 'password', 'secret', 'key')
+
+
+@dataclass(frozen=True)
+class ProviderParam:
+    """One constructor parameter of a provider class."""
+    name: str
+    required: bool
+    default: object = None
+
+
+@dataclass(frozen=True)
+class ProviderDescriptor:
+    """Introspected provider class."""
+    class_name: str
+    package_name: str
+    package_version: str
+    params: tuple[ProviderParam, ...]
+    supports: Optional[tuple[str, ...]]
+    flags: MappingProxyType
+    can_apply: bool
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ProviderDescriptor':
+        return cls(
+            class_name=data['class_name'],
+            package_name=data['package_name'],
+            package_version=data['package_version'],
+            params=tuple(ProviderParam(**p) for p in data['params']),
+            supports=tuple(data['supports']) if data['supports'] is not None else None,
+            flags=MappingProxyType(dict(data['flags'])),
+            can_apply=data['can_apply'],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'class_name': self.class_name,
+            'package_name': self.package_name,
+            'package_version': self.package_version,
+            'params': [asdict(p) for p in self.params],
+            'supports': list(self.supports) if self.supports is not None else None,
+            'flags': dict(self.flags),
+            'can_apply': self.can_apply,
+        }
+
+    @property
+    def name(self) -> str:
+        return self.class_name.rsplit('.', 1)[-1]
+
+    def derived_fields(self) -> tuple:
+        """Form field definitions derived from the constructor parameters.
+
+        Used for providers without a YAML schema.
+        """
+        fields = []
+        for param in self.params:
+            default = param.default
+            if isinstance(default, bool):
+                field_type = 'checkbox'
+            elif isinstance(default, (int, float)):
+                field_type = 'number'
+            else:
+                field_type = 'text'
+            field = {
+                'name': param.name,
+                'label': param.name.replace('_', ' ').capitalize(),
+                'type': field_type,
+                'required': param.required,
+                'env_ref': any(hint in param.name.lower() for hint in SECRET_HINTS),
+            }
+            # The form renders the default as text; None would show up as "None"
+            if isinstance(default, (bool, int, float, str)):
+                field['default'] = default
+            fields.append(MappingProxyType(field))
+        return tuple(fields)
+
+
+def _json_default(value):
+    """Keep only JSON-friendly constructor defaults."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return None
+
+
+def introspect_class(cls, package_name: str, package_version: str, class_name: str) -> ProviderDescriptor:
+    """Build a descriptor from a provider class."""
+    params = []
+    signature = inspect.signature(cls.__init__)
+    for name, param in list(signature.parameters.items())[1:]:
+        # 'id' is the provider name, passed positionally by octoDNS
+        if name == 'id' or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        required = param.default is inspect.Parameter.empty
+        params.append(ProviderParam(name=name, required=required,
+                                    default=None if required else _json_default(param.default)))
+
+    # Some providers compute SUPPORTS per instance (property); those stay unknown
+    supports = getattr(cls, 'SUPPORTS', None)
+    supports = tuple(sorted(supports)) if isinstance(supports, (set, frozenset, list, tuple)) else None
+
+    flags = {flag: getattr(cls, flag) for flag in SUPPORT_FLAGS
+             if isinstance(getattr(cls, flag, None), bool)}
+
+    return ProviderDescriptor(
+        class_name=class_name,
+        package_name=package_name,
+        package_version=package_version,
+        params=tuple(params),
+        supports=supports,
+        flags=MappingProxyType(flags),
+        can_apply=callable(getattr(cls, '_apply', None)),
+    )
+
+
+def _top_level_modules(dist) -> list[str]:
+    text = dist.read_text('top_level.txt')
+    if text:
+        return [line.strip() for line in text.splitlines() if line.strip()]
+
+    modules = set()
+    for path in dist.files or ():
+        top = path.parts[0]
+        if top.endswith(('.dist-info', '.egg-info')) or top in ('tests', '__pycache__'):
+            continue
+        if len(path.parts) == 1 and top.endswith('.py'):
+            modules.add(top[:-3])
+        elif len(path.parts) > 1 and path.name == '__init__.py':
+            modules.add(top)
+    return sorted(modules)
+
+
+def _provider_classes(dist) -> list[tuple[str, type]]:
+    """Import a distribution's provider classes as (class_name, class)."""
+    entry_points = [ep for ep in dist.entry_points if ep.group == ENTRY_POINT_GROUP]
+    if entry_points:
+        classes = []
+        for ep in entry_points:
+            cls = ep.load()
+            classes.append((f'{ep.module}.{cls.__name__}', cls))
+        return classes
+
+    from octodns.source.base import BaseSource
+
+    classes = []
+    for module_name in _top_level_modules(dist):
+        module = importlib.import_module(module_name)
+        for attr, value in sorted(vars(module).items()):
+            if attr.startswith('_') or not inspect.isclass(value) or inspect.isabstract(value):
+                continue
+            if value.__module__.split('.')[0] != module_name or not issubclass(value, BaseSource):
+                continue
+            classes.append((f'{module_name}.{attr}', value))
+    return classes
+
+
+def package_fingerprint() -> str:
+    """Fingerprint of the installed octoDNS package set."""
+    packages = [(p.name, p.version, p.location) for p in package_index.all()]
+    return hashlib.sha1(json.dumps([INDEX_FORMAT, packages]).encode()).hexdigest()
+
+
+class ProviderDiscovery:
+    """Persisted index of introspected provider classes."""
+
+    def __init__(self, index_path: Optional[str] = None):
+        self.index_path = index_path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._descriptors: Optional[MappingProxyType] = None
+        self._errors: MappingProxyType = MappingProxyType({})
+        self._fingerprint: Optional[str] = None
+
+    def init_app(self, app):
+        """Configure the index path and load a persisted index if still valid.
+
+        Never imports provider modules; a missing or stale index is built
+        by a dispatcher tick of the job runner (see build_in_background()).
+        """
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self.index_path = app.config.get('PROVIDER_INDEX_PATH') or \
+            os.path.join(zone_path, 'cache', INDEX_FILENAME)
+        self.logger = app.logger
+        self._load()
+
+        from services.job_runner import job_runner
+        job_runner.add_tick(self.build_in_background)
+        app.extensions['provider_discovery'] = self
+
+    def _load(self) -> bool:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('fingerprint') != package_fingerprint():
+                return False
+            descriptors = {d['class_name']: ProviderDescriptor.from_dict(d) for d in data['providers']}
+        except Exception as e:
+            self.logger.warning(f"Ignoring provider index {self.index_path}: {e}")
+            return False
+
+        with self._lock:
+            self._descriptors = MappingProxyType(descriptors)
+            self._errors = MappingProxyType(data.get('errors') or {})
+            self._fingerprint = data['fingerprint']
+        return True
+
+    def rebuild(self):
+        """Import and introspect all installed provider packages."""
+        start = time.monotonic()
+        descriptors, errors = {}, {}
+        for dist in distributions():
+            name = normalize_name(dist.metadata.get('Name', ''))
+            if not name.startswith(f'{PACKAGE_PREFIX}-'):
+                continue
+            try:
+                for class_name, cls in _provider_classes(dist):
+                    descriptors[class_name] = introspect_class(cls, name, dist.version, class_name)
+            except Exception as e:
+                errors[name] = str(e)
+                self.logger.warning(f"Provider discovery failed for {name}: {e}")
+
+        fingerprint = package_fingerprint()
+        with self._lock:
+            self._descriptors = MappingProxyType(dict(sorted(descriptors.items())))
+            self._errors = MappingProxyType(errors)
+            self._fingerprint = fingerprint
+
+        if self.index_path:
+            try:
+                write_atomic(self.index_path, json.dumps({
+                    'fingerprint': fingerprint,
+                    'providers': [d.to_dict() for d in self._descriptors.values()],
+                    'errors': errors,
+                }, indent=1))
+            except OSError as e:
+                self.logger.warning(f"Failed to write provider index: {e}")
+
+        self.logger.info(f"Discovered {len(descriptors)} provider classes "
+                         f"in {time.monotonic() - start:.2f}s")
+
+    def ensure_index(self) -> bool:
+        """Build the index unless a valid one is loaded or persisted.
+
+        Returns:
+            True if the index was rebuilt.
+        """
+        with self._build_lock:
+            if self._descriptors is not None or self._load():
+                return False
+            self.rebuild()
+            return True
+
+    def build_in_background(self):
+        """Dispatcher tick: build the index off the request threads."""
+        if self._descriptors is None:
+            self.ensure_index()
+
+    def _ensure_built(self) -> MappingProxyType:
+        # Only builds here if a page needs the index before the dispatcher did
+        descriptors = self._descriptors
+        if descriptors is None:
+            self.ensure_index()
+            descriptors = self._descriptors
+        return descriptors
+
+    def all(self) -> list[ProviderDescriptor]:
+        """Get all discovered providers, sorted by class name."""
+        return list(self._ensure_built().values())
+
+    def get(self, class_name: str) -> Optional[ProviderDescriptor]:
+        return self._ensure_built().get(class_name)
+
+    def peek(self, class_name: str) -> Optional[ProviderDescriptor]:
+        """Like get(), but never builds the index."""
+        descriptors = self._descriptors
+        return descriptors.get(class_name) if descriptors is not None else None
+
+    def errors(self) -> MappingProxyType:
+        """Packages that failed to import: package name -> error."""
+        self._ensure_built()
+        return self._errors
+
+
+provider_discovery = ProviderDiscovery()
+
+
+def get_descriptor(class_name: str) -> Optional[ProviderDescriptor]:
+    """Shortcut for ``provider_discovery.get()``."""
+    return provider_discovery.get(class_name)
@@ -1,18 +1,25 @@
 """Provider management service.
 
-Handles provider schema loading, version detection, and activation status.
+Handles provider info lookup, version detection, and activation status.
+Schemas themselves are loaded and cached by services.schema_registry;
+introspected provider classes come from services.provider_discovery. A
+YAML schema wins where both exist, discovery fills in record types and
+covers installed providers without a schema.
 """
-import json
-import os
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import Optional
 
-import yaml
-from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
 
-from models import EnvVar, Provider
+from extensions import db
+from models import EnvVar, Provider, Zone, ZoneTarget
 from services.crypto import decrypt_value
+from services.options_service import get_options
+from services.package_index import normalize_name, package_index, package_name_from_git
+from services.provider_discovery import ProviderDescriptor, get_descriptor, provider_discovery
+from services.schema_registry import get_schema, schema_registry
+from services.stats_cache import stats_cache
 
 
 @dataclass
@@ -26,51 +33,10 @@ class ProviderInfo:
     package_git: Optional[str]
     installed_version: Optional[str]
     is_enabled: bool
-    fields: list
+    fields: tuple
     capabilities: dict = field(default_factory=dict)
-
-
-def _get_schema_dir() -> Path:
-    """Get path to provider schemas directory."""
-    return Path(__file__).parent.parent / 'provider_schemas'
-
-
-def _load_schema(class_name: str) -> Optional[dict]:
-    """Load schema for a provider class.
-
-    Args:
-        class_name: Full class path (e.g. octodns_cloudflare.CloudflareProvider)
-
-    Returns:
-        Schema dict or None if not found.
-    """
-    # Convert class name to schema filename
-    # octodns_cloudflare.CloudflareProvider -> octodns_cloudflare.yaml
-    module_name = class_name.split('.')[0]
-    schema_file = _get_schema_dir() / f'{module_name}.yaml'
-
-    if not schema_file.exists():
-        return None
-
-    with open(schema_file, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
-
-
-def _get_all_schemas() -> list[dict]:
-    """Load all provider schemas."""
-    schemas = []
-    schema_dir = _get_schema_dir()
-
-    if not schema_dir.exists():
-        return schemas
-
-    for schema_file in schema_dir.glob('*.yaml'):
-        with open(schema_file, 'r', encoding='utf-8') as f:
-            schema = yaml.safe_load(f)
-            if schema:
-                schemas.append(schema)
-
-    return schemas
+    supports: Optional[tuple] = None  # Record types, None if unknown
+    has_schema: bool = True
 
 
 def _short_name_from_class(class_name: str) -> str:
@@ -93,51 +59,16 @@ def _get_installed_version(package_name: str) -> Optional[str]:
     Returns:
         Version string or None if not installed.
     """
-    if not package_name:
-        return None
-
-    try:
-        from importlib.metadata import version, PackageNotFoundError
-        # Normalize package name
-        normalized = package_name.lower().replace('_', '-')
-        return version(normalized)
-    except PackageNotFoundError:
-        return None
-    except Exception:
-        return None
+    return package_index.version(package_name)
 
 
 def get_enabled_providers_from_config() -> dict[str, bool]:
-    """Load enabled providers from HA addon config.
-
-    Reads from /data/options.json (HA addon options) or falls back
-    to a local config file for development.
+    """Get enabled providers from the HA addon config.
 
     Returns:
         Dict mapping provider short names to enabled status.
     """
-    # Try HA addon options first
-    ha_options_path = '/data/options.json'
-    if os.path.exists(ha_options_path):
-        try:
-            with open(ha_options_path, 'r') as f:
-                options = json.load(f)
-            return options.get('providers', {})
-        except Exception as e:
-            current_app.logger.warning(f"Failed to load addon options: {e}")
-
-    # Fallback: check for local development config
-    dev_config = Path(current_app.config.get('ZONE_FILE_PATH', './zones')) / 'addon_options.yaml'
-    if dev_config.exists():
-        try:
-            with open(dev_config, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-            return config.get('providers', {})
-        except Exception:
-            pass
-
-    # Default: all providers enabled
-    return {}
+    return dict(get_options().providers)
 
 
 def get_provider_info(class_name: str) -> Optional[ProviderInfo]:
@@ -147,44 +78,75 @@ def get_provider_info(class_name: str) -> Optional[ProviderInfo]:
         class_name: Full provider class path.
 
     Returns:
-        ProviderInfo or None if schema not found.
+        ProviderInfo or None if neither a schema nor an installed class exists.
     """
-    schema = _load_schema(class_name)
+    schema = get_schema(class_name)
     if not schema:
-        return None
+        descriptor = get_descriptor(class_name)
+        return _info_from_descriptor(descriptor) if descriptor else None
+
+    # Capability flags are optional here, so never build the index for them
+    descriptor = provider_discovery.peek(class_name)
 
-    package = schema.get('package', {})
-    package_name = package.get('name', '')
-    package_git = package.get('git')
     short_name = _short_name_from_class(class_name)
 
     # Check if enabled in config
-    enabled_providers = get_enabled_providers_from_config()
-    # If no config exists (empty dict), default to enabled
-    is_enabled = enabled_providers.get(short_name, True) if enabled_providers else True
+    is_enabled = get_options().is_provider_enabled(short_name)
 
     # Get installed version
-    installed_version = _get_installed_version(package_name)
+    # Git-only packages (e.g. octodns-pihole) are named after the repository
+    installed_version = _get_installed_version(
+        schema.package_name or package_name_from_git(schema.package_git))
 
     # Build capabilities
-    fields = schema.get('fields', [])
+    fields = schema.fields
     capabilities = {
-        'is_source': schema.get('is_source', False),
+        'is_source': schema.is_source,
         'supports_env_ref': any(f.get('env_ref', False) for f in fields),
         'field_types': list(set(f.get('type', 'text') for f in fields)),
     }
+    if descriptor:
+        capabilities.update({flag.lower(): value for flag, value in descriptor.flags.items()})
 
     return ProviderInfo(
         class_name=class_name,
-        name=schema.get('name', class_name),
-        is_source=schema.get('is_source', False),
-        documentation=schema.get('documentation', ''),
-        package_name=package_name,
-        package_git=package_git,
+        name=schema.name,
+        is_source=schema.is_source,
+        documentation=schema.documentation,
+        package_name=schema.package_name,
+        package_git=schema.package_git,
         installed_version=installed_version,
         is_enabled=is_enabled,
         fields=fields,
         capabilities=capabilities,
+        supports=descriptor.supports if descriptor else None,
+    )
+
+
+def _info_from_descriptor(descriptor: ProviderDescriptor) -> ProviderInfo:
+    """Build ProviderInfo for an installed provider without YAML schema."""
+    fields = descriptor.derived_fields()
+    # Providers that cannot apply changes are only useful as sources
+    is_source = not descriptor.can_apply
+    capabilities = {
+        'is_source': is_source,
+        'supports_env_ref': any(f['env_ref'] for f in fields),
+        'field_types': list(set(f['type'] for f in fields)),
+        **{flag.lower(): value for flag, value in descriptor.flags.items()},
+    }
+    return ProviderInfo(
+        class_name=descriptor.class_name,
+        name=descriptor.name,
+        is_source=is_source,
+        documentation='',
+        package_name=descriptor.package_name,
+        package_git=None,
+        installed_version=descriptor.package_version,
+        is_enabled=get_options().is_provider_enabled(_short_name_from_class(descriptor.class_name)),
+        fields=fields,
+        capabilities=capabilities,
+        supports=descriptor.supports,
+        has_schema=False,
     )
 
 
@@ -192,18 +154,48 @@ def get_all_provider_info() -> list[ProviderInfo]:
     """Get info for all available provider types.
 
     Returns:
-        List of ProviderInfo for all schema-defined providers.
+        ProviderInfo for all schema-defined providers, followed by installed
+        providers that have no schema.
     """
     providers = []
-    for schema in _get_all_schemas():
-        class_name = schema.get('class')
-        if class_name:
-            info = get_provider_info(class_name)
-            if info:
-                providers.append(info)
+    for schema in schema_registry.all():
+        info = get_provider_info(schema.class_name)
+        if info:
+            providers.append(info)
+
+    for descriptor in provider_discovery.all():
+        if not get_schema(descriptor.class_name):
+            providers.append(_info_from_descriptor(descriptor))
     return providers
 
 
+def get_installed_packages() -> list[dict]:
+    """Get installed octoDNS packages with the provider types using them.
+
+    Returns:
+        List of dicts with 'package' (PackageInfo), 'providers' (schema
+        names), 'classes' (discovered ProviderDescriptors) and 'error'.
+    """
+    used_by = {}
+    for schema in schema_registry.all():
+        name = normalize_name(schema.package_name or package_name_from_git(schema.package_git))
+        used_by.setdefault(name, []).append(schema.name)
+
+    classes = {}
+    for descriptor in provider_discovery.all():
+        classes.setdefault(descriptor.package_name, []).append(descriptor)
+
+    return [
+        {
+            'package': package,
+            'providers': used_by.get(package.name, []),
+            'classes': classes.get(package.name, []),
+            'error': provider_discovery.errors().get(package.name),
+        }
+        for package in package_index.all()
+    ]
+
+
 def get_enabled_provider_info() -> list[ProviderInfo]:
     """Get info for only enabled provider types.
 
@@ -213,46 +205,200 @@ def get_enabled_provider_info() -> list[ProviderInfo]:
     return [p for p in get_all_provider_info() if p.is_enabled]
 
 
+def _usage_subqueries():
+    source_counts = db.session.query(
+        Zone.source_id.label('provider_id'), func.count(Zone.id).label('count')
+    ).group_by(Zone.source_id).subquery()
+    target_counts = db.session.query(
+        ZoneTarget.target_id.label('provider_id'), func.count(ZoneTarget.id).label('count')
+    ).group_by(ZoneTarget.target_id).subquery()
+    return source_counts, target_counts
+
+
+def get_providers_with_usage() -> list[tuple[Provider, int, int]]:
+    """Get all providers with their zone usage counts in a single query.
+
+    Returns:
+        List of (provider, source_zone_count, target_zone_count), ordered by name.
+    """
+    source_counts, target_counts = _usage_subqueries()
+    rows = db.session.query(
+        Provider,
+        func.coalesce(source_counts.c.count, 0),
+        func.coalesce(target_counts.c.count, 0),
+    ).outerjoin(source_counts, source_counts.c.provider_id == Provider.id) \
+     .outerjoin(target_counts, target_counts.c.provider_id == Provider.id) \
+     .order_by(Provider.name)
+    return [(provider, sources, targets) for provider, sources, targets in rows]
+
+
+def get_provider_usage(provider_id: int) -> tuple[int, int]:
+    """Count the zones using a provider as source and as target.
+
+    Returns:
+        Tuple of (source_zone_count, target_zone_count).
+    """
+    sources = db.session.query(func.count(Zone.id)).filter(Zone.source_id == provider_id)
+    targets = db.session.query(func.count(ZoneTarget.id)).filter(ZoneTarget.target_id == provider_id)
+    return tuple(db.session.query(sources.scalar_subquery(), targets.scalar_subquery()).one())
+
+
+def get_zones_with_targets() -> list[Zone]:
+    """Get all zones with source and target providers eager-loaded.
+
+    Runs a constant number of queries regardless of the number of zones.
+    """
+    return Zone.query.options(
+        joinedload(Zone.source),
+        selectinload(Zone.targets).joinedload(ZoneTarget.target),
+    ).order_by(Zone.name).all()
+
+
 def get_available_env_vars() -> list[dict]:
     """Get list of available environment variables for dropdown.
 
     Returns:
         List of dicts with 'key' and 'reference' (env/KEY format).
     """
-    env_vars = EnvVar.query.order_by(EnvVar.key).all()
+    keys, _ = stats_cache.env_var_keys()
     return [
-        {'key': ev.key, 'reference': f'env/{ev.key}'}
-        for ev in env_vars
+        {'key': key, 'reference': f'env/{key}'}
+        for key in keys
     ]
 
 
+ENV_REF_PREFIX = 'env/'
+
+
+def _is_env_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(ENV_REF_PREFIX) and len(value) > len(ENV_REF_PREFIX)
+
+
+def _collect_env_refs(value, refs: set[str]):
+    """Collect env/ variable names from a (possibly nested) config value."""
+    if _is_env_ref(value):
+        refs.add(value[len(ENV_REF_PREFIX):])
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect_env_refs(item, refs)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_env_refs(item, refs)
+
+
+def _load_env_values(names) -> dict[str, str]:
+    """Fetch and decrypt environment variables in one query.
+
+    Args:
+        names: Variable names to look up.
+
+    Returns:
+        Dict of name -> decrypted value. Unknown names and values that fail
+        to decrypt are left out.
+    """
+    names = set(names)
+    if not names:
+        return {}
+
+    values = {}
+    for env_var in EnvVar.query.filter(EnvVar.key.in_(names)).all():
+        try:
+            values[env_var.key] = decrypt_value(env_var.value_encrypted)
+        except Exception:
+            continue
+    return values
+
+
+def _substitute_env_refs(value, values: dict[str, str]):
+    """Return a copy of value with every env/ reference replaced."""
+    if _is_env_ref(value):
+        return values.get(value[len(ENV_REF_PREFIX):])
+    if isinstance(value, dict):
+        return {k: _substitute_env_refs(v, values) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_substitute_env_refs(v, values) for v in value]
+    return value
+
+
 def resolve_env_reference(value: str) -> tuple[Optional[str], bool, Optional[str]]:
     """Resolve an env/ reference to its actual value.
 
+    Prefer resolve_config() when resolving more than one value.
+
     Args:
         value: Config value, possibly 'env/VARIABLE_NAME'.
 
     Returns:
         Tuple of (resolved_value, is_env_ref, env_var_name).
     """
-    if not value or not isinstance(value, str):
+    if not _is_env_ref(value):
         return (value, False, None)
 
-    if not value.startswith('env/'):
-        return (value, False, None)
+    env_var_name = value[len(ENV_REF_PREFIX):]
+    resolved = _load_env_values([env_var_name]).get(env_var_name)
+    return (resolved, True, env_var_name)
 
-    env_var_name = value[4:]
 
-    # Look up in database
-    env_var = EnvVar.query.filter_by(key=env_var_name).first()
-    if env_var:
-        try:
-            resolved = decrypt_value(env_var.value_encrypted)
-            return (resolved, True, env_var_name)
-        except Exception:
-            return (None, True, env_var_name)
+def resolve_config(config: dict) -> tuple[dict, list[str]]:
+    """Resolve all env/ references in a provider config.
+
+    Args:
+        config: Provider config dict, values may be 'env/VARIABLE_NAME'.
+
+    Returns:
+        Tuple of (resolved_config, missing_env_var_names). Missing or
+        undecryptable references resolve to None.
+    """
+    refs = set()
+    _collect_env_refs(config or {}, refs)
+    values = _load_env_values(refs)
+    missing = sorted(refs - values.keys())
+    return (_substitute_env_refs(config or {}, values), missing)
 
-    return (None, True, env_var_name)
+
+def resolve_many(providers) -> tuple[dict[int, dict], list[str]]:
+    """Resolve the configs of several providers with a single query.
+
+    Every distinct secret is fetched and decrypted only once, no matter how
+    many providers reference it.
+
+    Args:
+        providers: Iterable of Provider rows.
+
+    Returns:
+        Tuple of (provider_id -> resolved_config, missing_env_var_names).
+    """
+    providers = list(providers)
+    refs = set()
+    for provider in providers:
+        _collect_env_refs(provider.config_json or {}, refs)
+
+    values = _load_env_values(refs)
+    resolved = {
+        provider.id: _substitute_env_refs(provider.config_json or {}, values)
+        for provider in providers
+    }
+    return (resolved, sorted(refs - values.keys()))
+
+
+def resolve_env_values(providers) -> tuple[dict[str, str], list[str]]:
+    """Resolve the env/ variables referenced by several providers.
+
+    Used to build the process environment for octoDNS, which resolves
+    env/NAME references from os.environ itself.
+
+    Args:
+        providers: Iterable of Provider rows.
+
+    Returns:
+        Tuple of (name -> decrypted value, missing_env_var_names).
+    """
+    refs = set()
+    for provider in providers:
+        _collect_env_refs(provider.config_json or {}, refs)
+
+    values = _load_env_values(refs)
+    return (values, sorted(refs - values.keys()))
 
 
 def validate_provider_config(provider_type: str, config: dict) -> list[str]:
@@ -266,12 +412,12 @@ def validate_provider_config(provider_type: str, config: dict) -> list[str]:
         List of validation error messages (empty if valid).
     """
     errors = []
-    schema = _load_schema(provider_type)
+    info = get_provider_info(provider_type)
 
-    if not schema:
+    if not info:
         return [f"Unbekannter Provider-Typ: {provider_type}"]
 
-    for field_def in schema.get('fields', []):
+    for field_def in info.fields:
         field_name = field_def['name']
         value = config.get(field_name)
 
@@ -0,0 +1,191 @@
+"""Provider schema registry.
+
+Loads the YAML schemas from provider_schemas/ once and keeps them in an
+indexed, read-only form. Schema files are only re-read when their mtime
+or size changes.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
+
+import yaml
+
+from services.utils import SafeLoader, freeze
+
+# Seconds between two stat() passes over the schema directory
+DEFAULT_CHECK_INTERVAL = 5.0
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    """Return (mtime_ns, size) used to detect schema changes."""
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@dataclass(frozen=True)
+class ProviderSchema:
+    """Parsed, immutable provider schema."""
+    class_name: str
+    module_name: str
+    name: str
+    is_source: bool
+    documentation: str
+    package_name: str
+    package_git: Optional[str]
+    concurrency: Optional[int]
+    fields: tuple
+    raw: MappingProxyType
+    path: str
+    signature: tuple[int, int]
+
+    @classmethod
+    def from_dict(cls, data: dict, path: Path, signature: tuple[int, int]) -> 'ProviderSchema':
+        class_name = data['class']
+        package = data.get('package') or {}
+        return cls(
+            class_name=class_name,
+            module_name=class_name.split('.')[0],
+            name=data.get('name', class_name),
+            is_source=bool(data.get('is_source', False)),
+            documentation=data.get('documentation', ''),
+            package_name=package.get('name', ''),
+            package_git=package.get('git'),
+            concurrency=int(data['concurrency']) if data.get('concurrency') else None,
+            fields=freeze(data.get('fields') or []),
+            raw=freeze(data),
+            path=str(path),
+            signature=signature,
+        )
+
+
+class SchemaRegistry:
+    """In-process cache of all provider schemas.
+
+    Schemas are indexed by full class name and by module name. Lookups
+    re-stat the schema directory at most every ``check_interval`` seconds
+    and only re-parse files whose signature changed.
+    """
+
+    def __init__(self, schema_dir: Optional[Path] = None,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.schema_dir = Path(schema_dir) if schema_dir else \
+            Path(__file__).parent.parent / 'provider_schemas'
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._by_file: dict[str, ProviderSchema] = {}
+        # Signatures of all seen files, including invalid ones without a schema
+        self._signatures: dict[str, tuple[int, int]] = {}
+        self._by_class: MappingProxyType = MappingProxyType({})
+        self._by_module: MappingProxyType = MappingProxyType({})
+        self._ordered: tuple[ProviderSchema, ...] = ()
+        self._last_check = 0.0
+        self._loaded = False
+
+    def init_app(self, app):
+        """Bind the registry to an app and load all schemas."""
+        if app.config.get('PROVIDER_SCHEMA_DIR'):
+            self.schema_dir = Path(app.config['PROVIDER_SCHEMA_DIR'])
+        self.check_interval = app.config.get('SCHEMA_CHECK_INTERVAL', self.check_interval)
+        self.logger = app.logger
+        self.refresh(force=True)
+        app.extensions['schema_registry'] = self
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload schema files whose mtime or size changed.
+
+        Args:
+            force: Skip the check interval and stat the directory now.
+
+        Returns:
+            True if the index was rebuilt.
+        """
+        now = time.monotonic()
+        if not force and self._loaded and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            if not force and self._loaded and now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+
+            current = {}
+            if self.schema_dir.exists():
+                for schema_file in sorted(self.schema_dir.glob('*.yaml')):
+                    try:
+                        current[schema_file.name] = (schema_file, _file_signature(schema_file))
+                    except OSError:
+                        continue
+
+            signatures = {name: sig for name, (_, sig) in current.items()}
+            if self._loaded and signatures == self._signatures:
+                return False
+
+            by_file = {}
+            for name, (schema_file, sig) in current.items():
+                cached = self._by_file.get(name)
+                if cached and cached.signature == sig:
+                    by_file[name] = cached
+                    continue
+                if self._signatures.get(name) == sig:
+                    # Unchanged file that was skipped before
+                    continue
+                schema = self._parse(schema_file, sig)
+                if schema:
+                    by_file[name] = schema
+
+            ordered = tuple(by_file.values())
+            self._by_file = by_file
+            self._signatures = signatures
+            self._by_class = MappingProxyType({s.class_name: s for s in ordered})
+            self._by_module = MappingProxyType({s.module_name: s for s in ordered})
+            self._ordered = ordered
+            self._loaded = True
+            return True
+
+    def _parse(self, schema_file: Path, signature: tuple[int, int]) -> Optional[ProviderSchema]:
+        """Load one schema file; invalid files are logged and skipped."""
+        try:
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=SafeLoader)
+        except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+            self.logger.error(f"Skipping invalid provider schema {schema_file.name}: {e}")
+            return None
+        if not isinstance(data, dict) or not data.get('class'):
+            self.logger.warning(f"Skipping provider schema {schema_file.name}: no 'class' defined")
+            return None
+        return ProviderSchema.from_dict(data, schema_file, signature)
+
+    def get(self, class_name: str) -> Optional[ProviderSchema]:
+        """Look up a schema by full class path, falling back to the module name.
+
+        Args:
+            class_name: Full class path (e.g. octodns_cloudflare.CloudflareProvider)
+
+        Returns:
+            ProviderSchema or None if not found.
+        """
+        if not class_name:
+            return None
+        self.refresh()
+        schema = self._by_class.get(class_name)
+        if schema is None:
+            schema = self._by_module.get(class_name.split('.')[0])
+        return schema
+
+    def all(self) -> tuple[ProviderSchema, ...]:
+        """Return all loaded schemas."""
+        self.refresh()
+        return self._ordered
+
+
+schema_registry = SchemaRegistry()
+
+
+def get_schema(class_name: str) -> Optional[ProviderSchema]:
+    """Shortcut for ``schema_registry.get()``."""
+    return schema_registry.get(class_name)
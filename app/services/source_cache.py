@@ -0,0 +1,193 @@
+"""On-disk snapshots of populated source zones.
+
+Sources like NetBox DNS are fetched with large paginated API pulls. The
+sync engine stores every populated source zone as a gzipped JSON snapshot
+keyed by provider id, config hash and zone name. Dry-runs reuse snapshots
+younger than the TTL instead of pulling the source again; applying syncs
+always fetch fresh data and refresh the snapshot.
+
+Snapshots can be dropped per provider or as a whole (sync page, provider
+edit/delete).
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from services.options_service import get_options
+from services.utils import write_atomic
+
+DEFAULT_TTL_MINUTES = 10
+SNAPSHOT_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Number and total size of stored snapshots."""
+    snapshots: int
+    size: int
+
+
+class SourceCache:
+    """Snapshot store below <ZONE_FILE_PATH>/cache/sources/<provider id>/."""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl_minutes: float = DEFAULT_TTL_MINUTES):
+        self.cache_dir = cache_dir
+        self.default_ttl_minutes = ttl_minutes
+        self.logger = logging.getLogger(__name__)
+        self._stats_lock = threading.Lock()
+        self._stats: Optional[tuple[tuple, CacheStats]] = None
+
+    def init_app(self, app):
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self.cache_dir = app.config.get('SOURCE_CACHE_DIR') or \
+            os.path.join(zone_path, 'cache', 'sources')
+        self.default_ttl_minutes = float(app.config.get('SOURCE_CACHE_TTL_MINUTES', self.default_ttl_minutes))
+        self.logger = app.logger
+        app.extensions['source_cache'] = self
+
+    @property
+    def ttl(self) -> float:
+        """Snapshot lifetime in seconds (addon option source_cache_ttl_minutes)."""
+        minutes = get_options().get('source_cache_ttl_minutes')
+        return float(self.default_ttl_minutes if minutes is None else minutes) * 60
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cache_dir) and self.ttl > 0
+
+    def _path(self, provider_id: int, config_hash: str, zone_name: str) -> str:
+        key = hashlib.sha1(f'{config_hash}\0{zone_name}'.encode()).hexdigest()
+        return os.path.join(self.cache_dir, str(provider_id), f'{key}.json.gz')
+
+    def get(self, provider_id: int, config_hash: str, zone_name: str, source=None,
+            lenient: bool = False):
+        """Load a snapshot as a new octoDNS zone.
+
+        Args:
+            provider_id: Source provider id.
+            config_hash: Hash of the resolved source config.
+            zone_name: Zone name (with trailing dot).
+            source: Provider instance set as the records' source.
+            lenient: Passed to octoDNS record validation.
+
+        Returns:
+            Populated octodns Zone, or None if missing, expired or unreadable.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(provider_id, config_hash, zone_name)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.ttl:
+                return None
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except OSError:
+            return None
+        except ValueError as e:
+            self.logger.warning(f"Ignoring broken source snapshot {path}: {e}")
+            return None
+
+        if snapshot.get('format') != SNAPSHOT_FORMAT or snapshot.get('zone') != zone_name:
+            return None
+
+        from octodns.record import Record
+        from octodns.zone import Zone as OctoZone
+
+        zone = OctoZone(zone_name, [])
+        try:
+            for name, record_type, data in snapshot['records']:
+                record = Record.new(zone, name, {**data, 'type': record_type},
+                                    source=source, lenient=lenient)
+                zone.add_record(record, lenient=lenient)
+        except Exception as e:
+            self.logger.warning(f"Ignoring source snapshot {path}: {e}")
+            return None
+        return zone
+
+    def put(self, provider_id: int, config_hash: str, zone):
+        """Store a populated zone."""
+        if not self.enabled:
+            return
+        snapshot = {
+            'format': SNAPSHOT_FORMAT,
+            'zone': zone.name,
+            'records': sorted(
+                ([record.name, record._type, record.data] for record in zone.records),
+                key=lambda r: (r[0], r[1]),
+            ),
+        }
+        payload = gzip.compress(json.dumps(snapshot, separators=(',', ':'), default=str).encode())
+        path = self._path(provider_id, config_hash, zone.name)
+        try:
+            write_atomic(path, payload)
+        except OSError as e:
+            self.logger.warning(f"Failed to write source snapshot {path}: {e}")
+        self._stats = None
+
+    def invalidate(self, provider_id: Optional[int] = None) -> int:
+        """Drop the snapshots of one provider, or all snapshots.
+
+        Returns:
+            Number of removed snapshots.
+        """
+        if not self.cache_dir:
+            return 0
+        root = os.path.join(self.cache_dir, str(provider_id)) if provider_id is not None \
+            else self.cache_dir
+        removed = self._count(root).snapshots
+        shutil.rmtree(root, ignore_errors=True)
+        self._stats = None
+        return removed
+
+    def _signature(self) -> Optional[tuple]:
+        """mtimes of the cache directory and the per-provider directories.
+
+        Writing (rename) or deleting a snapshot changes the mtime of its
+        directory, in every process, so unchanged stats need no file walk.
+        """
+        try:
+            entries = [('', os.stat(self.cache_dir).st_mtime_ns)]
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        entries.append((entry.name, entry.stat().st_mtime_ns))
+        except OSError:
+            return None
+        return tuple(sorted(entries))
+
+    def stats(self) -> CacheStats:
+        """Number and size of all snapshots; only re-counted when a directory changed."""
+        if not self.cache_dir:
+            return CacheStats(snapshots=0, size=0)
+        signature = self._signature()
+        if signature is None:
+            return CacheStats(snapshots=0, size=0)
+        cached = self._stats
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with self._stats_lock:
+            stats = self._count(self.cache_dir)
+            self._stats = (signature, stats)
+        return stats
+
+    def _count(self, root: str) -> CacheStats:
+        snapshots = size = 0
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                if filename.endswith('.json.gz'):
+                    snapshots += 1
+                    try:
+                        size += os.path.getsize(os.path.join(directory, filename))
+                    except OSError:
+                        pass
+        return CacheStats(snapshots=snapshots, size=size)
+
+
+source_cache = SourceCache()
@@ -0,0 +1,61 @@
+"""One-time startup tasks.
+
+Creating tables, running migrations, setting up the Fernet key and writing
+the octoDNS config must not run concurrently in several worker processes.
+The tasks run under an inter-process lock; when served by gunicorn the
+master runs them once before forking (see gunicorn.conf.py) and marks the
+environment so the workers skip them.
+"""
+import os
+
+from extensions import db
+from services.process_lock import FileLock
+
+STARTUP_DONE_ENV = 'OCTODNS_GUI_STARTUP_DONE'
+
+
+def startup_lock_path(app) -> str:
+    zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+    return app.config.get('STARTUP_LOCK_PATH') or os.path.join(zone_path, '.startup.lock')
+
+
+def mark_startup_done():
+    """Let processes forked from this one skip the startup tasks."""
+    os.environ[STARTUP_DONE_ENV] = '1'
+
+
+def run_startup_tasks(app, force: bool = False) -> bool:
+    """Prepare database, encryption key and octoDNS config.
+
+    Args:
+        app: Flask app.
+        force: Run even if a parent process already did.
+
+    Returns:
+        True if the tasks ran in this call.
+    """
+    if not force and os.environ.get(STARTUP_DONE_ENV) == '1':
+        return False
+
+    with FileLock(startup_lock_path(app)), app.app_context():
+        db.create_all()
+
+        # Bring existing databases up to date (columns, indexes)
+        from services.migrations import run_migrations
+        run_migrations(app.logger)
+
+        # Load or generate the Fernet key before workers race to create it
+        from services.crypto import get_cipher
+        try:
+            get_cipher()
+        except Exception as e:
+            app.logger.error(f"Failed to set up encryption key: {e}")
+
+        # Make sure the octoDNS config reflects the database
+        from services.config_generator import generate_config
+        try:
+            generate_config()
+        except Exception as e:
+            app.logger.error(f"Failed to generate octoDNS config: {e}")
+
+    return True
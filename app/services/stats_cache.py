@@ -0,0 +1,263 @@
+"""Cached dashboard statistics.
+
+Row counts and the most recent sync jobs are kept in memory and updated
+from SQLAlchemy events instead of running COUNT(*) queries on every
+dashboard load. Changes are collected per session during flush and only
+applied on commit, so rolled back inserts never skew the numbers.
+
+Other worker processes (e.g. the one running sync jobs) do not see these
+events, so every commit with relevant changes also touches a version
+file; a read reloads when the file changed since the last load. A TTL
+forces a reload now and then in case the cache drifted anyway.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+
+from extensions import db
+from models import EnvVar, Provider, SyncJob, Zone
+
+DEFAULT_TTL = 300.0
+RECENT_JOBS = 5
+VERSION_FILENAME = '.stats-version'
+
+COUNTED_MODELS = {
+    EnvVar: 'env_vars',
+    Provider: 'providers',
+    Zone: 'zones',
+}
+
+
+@dataclass(frozen=True)
+class JobSnapshot:
+    """The SyncJob fields shown on the dashboard."""
+    id: int
+    status: str
+    trigger_type: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_job(cls, job: SyncJob) -> 'JobSnapshot':
+        return cls(id=job.id, status=job.status, trigger_type=job.trigger_type,
+                   created_at=job.created_at)
+
+
+class StatsCache:
+    """Dashboard counters kept current by ORM events."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+        self._recent_jobs: Optional[list[JobSnapshot]] = None
+        self._env_keys: Optional[tuple[str, ...]] = None
+        self._env_keys_changed: datetime = datetime.utcnow()
+        self._env_keys_loaded_at: float = 0.0
+        self._loaded_at: Optional[float] = None
+        self._listening = False
+        # Bumped by every commit and invalidation; a load that overlapped one is not stored
+        self._generation = 0
+        self._version_path: Optional[str] = None
+        self._version: Optional[int] = None
+        self._env_keys_version: Optional[int] = None
+
+    def init_app(self, app):
+        self.ttl = float(app.config.get('STATS_CACHE_TTL', self.ttl))
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self._version_path = os.path.join(zone_path, VERSION_FILENAME)
+        self._listen()
+        app.extensions['stats_cache'] = self
+
+    # -- Cross-process version ------------------------------------------
+
+    def _read_version(self) -> Optional[int]:
+        if self._version_path is None:
+            return None
+        try:
+            return os.stat(self._version_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _bump_version(self) -> tuple[Optional[int], Optional[int]]:
+        """Signal a change to the other processes.
+
+        Returns:
+            Tuple of (version before, version after).
+        """
+        before = self._read_version()
+        if self._version_path is None:
+            return before, before
+        try:
+            with open(self._version_path, 'a'):
+                pass
+            os.utime(self._version_path)
+        except OSError:
+            return before, before
+        return before, self._read_version()
+
+    # -- Event handling -------------------------------------------------
+
+    def _listen(self):
+        if self._listening:
+            return
+        for model in (*COUNTED_MODELS, SyncJob):
+            event.listen(model, 'after_insert', self._on_insert)
+            event.listen(model, 'after_delete', self._on_delete)
+        event.listen(SyncJob, 'after_update', self._on_job_update)
+        event.listen(Session, 'after_commit', self._on_commit)
+        event.listen(Session, 'after_rollback', self._on_rollback)
+        event.listen(Session, 'do_orm_execute', self._on_orm_execute)
+        self._listening = True
+
+    @staticmethod
+    def _pending(session) -> dict:
+        return session.info.setdefault('stats_cache', {'counts': {}, 'jobs': {}, 'reload_jobs': False})
+
+    def _on_insert(self, mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+        pending = self._pending(session)
+        key = COUNTED_MODELS.get(type(target))
+        if key:
+            pending['counts'][key] = pending['counts'].get(key, 0) + 1
+        elif isinstance(target, SyncJob):
+            pending['jobs'][target.id] = JobSnapshot.from_job(target)
+
+    def _on_delete(self, mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+        pending = self._pending(session)
+        key = COUNTED_MODELS.get(type(target))
+        if key:
+            pending['counts'][key] = pending['counts'].get(key, 0) - 1
+        elif isinstance(target, SyncJob):
+            pending['reload_jobs'] = True
+
+    def _on_job_update(self, mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            self._pending(session)['jobs'][target.id] = JobSnapshot.from_job(target)
+
+    def _on_orm_execute(self, state):
+        # Bulk UPDATE/DELETE (e.g. the job runner's claim) bypass mapper events
+        if (state.is_update or state.is_delete) and state.bind_mapper is not None \
+                and state.bind_mapper.class_ is SyncJob:
+            self._pending(state.session)['reload_jobs'] = True
+
+    def _on_rollback(self, session):
+        session.info.pop('stats_cache', None)
+
+    def _on_commit(self, session):
+        pending = session.info.pop('stats_cache', None)
+        if not pending or not (pending['counts'] or pending['jobs'] or pending['reload_jobs']):
+            return
+        with self._lock:
+            self._generation += 1
+            before, after = self._bump_version()
+            # This process applies its own changes below; stay current unless
+            # another process changed something since the last load
+            if self._version == before:
+                self._version = after
+            if self._env_keys_version == before:
+                self._env_keys_version = after
+            if pending['counts'].get('env_vars') is not None:
+                self._env_keys = None
+                self._env_keys_changed = datetime.utcnow()
+            if self._loaded_at is None:
+                return
+            for key, delta in pending['counts'].items():
+                self._counts[key] = max(0, self._counts.get(key, 0) + delta)
+            if pending['reload_jobs'] or self._recent_jobs is None:
+                self._recent_jobs = None
+            elif pending['jobs']:
+                jobs = {job.id: job for job in self._recent_jobs}
+                jobs.update(pending['jobs'])
+                self._recent_jobs = sorted(jobs.values(), key=lambda j: (j.created_at, j.id),
+                                           reverse=True)[:RECENT_JOBS]
+
+    # -- Reads ----------------------------------------------------------
+
+    def _load_counts(self):
+        counts = {}
+        for model, key in COUNTED_MODELS.items():
+            counts[key] = db.session.query(func.count(model.id)).scalar()
+        return counts
+
+    def _load_recent_jobs(self) -> list[JobSnapshot]:
+        jobs = SyncJob.query.order_by(SyncJob.created_at.desc()).limit(RECENT_JOBS).all()
+        return [JobSnapshot.from_job(job) for job in jobs]
+
+    def get(self) -> dict:
+        """Get dashboard stats, loading from the database only when needed."""
+        now = time.monotonic()
+        version = self._read_version()
+        with self._lock:
+            generation = self._generation
+            expired = self._loaded_at is None or now - self._loaded_at >= self.ttl \
+                or version != self._version
+            counts = None if expired else dict(self._counts)
+            recent_jobs = None if expired else self._recent_jobs
+
+        if counts is None:
+            counts = self._load_counts()
+        if recent_jobs is None:
+            recent_jobs = self._load_recent_jobs()
+
+        with self._lock:
+            # A commit during the load may not be part of it; reload next time
+            if self._generation == generation:
+                if expired:
+                    self._counts = dict(counts)
+                    self._loaded_at = now
+                    self._version = version
+                self._recent_jobs = recent_jobs
+
+        return {**counts, 'recent_jobs': recent_jobs}
+
+    def env_var_keys(self) -> tuple[tuple[str, ...], datetime]:
+        """Get all EnvVar keys (sorted) and when the key set last changed.
+
+        Only keys are cached, never values. The list is reloaded after an
+        EnvVar insert/delete was committed or when the TTL expired.
+        """
+        now = time.monotonic()
+        version = self._read_version()
+        with self._lock:
+            generation = self._generation
+            keys = self._env_keys
+            changed = self._env_keys_changed
+            if keys is not None and (now - self._env_keys_loaded_at >= self.ttl
+                                     or version != self._env_keys_version):
+                keys = None
+
+        if keys is None:
+            keys = tuple(key for (key,) in db.session.query(EnvVar.key).order_by(EnvVar.key))
+            with self._lock:
+                if self._env_keys is not None and self._env_keys != keys:
+                    self._env_keys_changed = datetime.utcnow()
+                if self._generation == generation:
+                    self._env_keys = keys
+                    self._env_keys_loaded_at = now
+                    self._env_keys_version = version
+                changed = self._env_keys_changed
+
+        return keys, changed
+
+    def invalidate(self):
+        """Force a reload on the next read."""
+        with self._lock:
+            self._generation += 1
+            self._loaded_at = None
+            self._recent_jobs = None
+            self._env_keys = None
+
+
+stats_cache = StatsCache()
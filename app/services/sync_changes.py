@@ -0,0 +1,96 @@
+"""Normalized storage and queries for sync job changes.
+
+Every planned record change is stored as one row in sync_changes instead
+of a single JSON blob, so job pages can filter, paginate and aggregate in
+SQL without decoding the whole diff.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import func, insert
+
+from extensions import db
+from models import SyncChange
+
+INSERT_BATCH_SIZE = 1000
+ACTIONS = ('create', 'update', 'delete')
+
+
+def store_changes(job_id: int, results: Iterable) -> int:
+    """Bulk-insert the changes of a sync run.
+
+    Args:
+        job_id: SyncJob id.
+        results: Iterable of sync_engine.TargetResult.
+
+    Returns:
+        Number of stored changes.
+    """
+    total = 0
+    batch = []
+    for result in results:
+        for change in result.changes:
+            batch.append({
+                'job_id': job_id,
+                'zone': result.zone,
+                'target': result.target,
+                'action': change['action'],
+                'record_name': change['name'],
+                'record_type': change['type'],
+            })
+            if len(batch) >= INSERT_BATCH_SIZE:
+                db.session.execute(insert(SyncChange), batch)
+                total += len(batch)
+                batch = []
+    if batch:
+        db.session.execute(insert(SyncChange), batch)
+        total += len(batch)
+    return total
+
+
+def query_changes(job_id: int, zone: Optional[str] = None, action: Optional[str] = None,
+                  target: Optional[str] = None, page: int = 1, per_page: int = 50):
+    """Get a page of changes of a job, optionally filtered.
+
+    Returns:
+        flask_sqlalchemy Pagination of SyncChange rows.
+    """
+    query = SyncChange.query.filter_by(job_id=job_id)
+    if zone:
+        query = query.filter_by(zone=zone)
+    if action:
+        query = query.filter_by(action=action)
+    if target:
+        query = query.filter_by(target=target)
+    query = query.order_by(SyncChange.zone, SyncChange.target,
+                           SyncChange.record_name, SyncChange.record_type)
+    return query.paginate(page=page, per_page=per_page, max_per_page=500, error_out=False)
+
+
+def change_summary(job_id: int) -> dict:
+    """Aggregate counts of a job's changes.
+
+    Returns:
+        Dict with 'total', 'actions' (action -> count), 'zones' and
+        'targets' (name -> count), all computed in SQL.
+    """
+    actions = dict(db.session.query(SyncChange.action, func.count())
+                   .filter_by(job_id=job_id).group_by(SyncChange.action))
+    zones = dict(db.session.query(SyncChange.zone, func.count())
+                 .filter_by(job_id=job_id).group_by(SyncChange.zone).order_by(SyncChange.zone))
+    targets = dict(db.session.query(SyncChange.target, func.count())
+                   .filter_by(job_id=job_id).group_by(SyncChange.target).order_by(SyncChange.target))
+    return {
+        'total': sum(actions.values()),
+        'actions': {a: actions.get(a, 0) for a in ACTIONS},
+        'zones': zones,
+        'targets': targets,
+    }
+
+
+def change_counts(job_ids: list[int]) -> dict[int, int]:
+    """Total change count per job for a list of jobs, in one query."""
+    if not job_ids:
+        return {}
+    rows = db.session.query(SyncChange.job_id, func.count()) \
+        .filter(SyncChange.job_id.in_(job_ids)).group_by(SyncChange.job_id)
+    return dict(rows)
@@ -0,0 +1,307 @@
+"""In-process octoDNS sync engine.
+
+Fetches every source zone once, shares the populated zone across all of
+its targets and plans/applies the targets concurrently in a thread pool.
+Each provider instance is limited to the number of parallel operations
+given by ``concurrency`` in its schema.
+
+Populated source zones are written to the snapshot cache
+(services.source_cache); engines built with ``use_cached_sources`` read
+them back instead of fetching the source again.
+
+Targets whose source records and config are unchanged since they were
+last verified in sync are skipped (see services.sync_state), unless the
+engine runs as a full sync.
+
+All database access happens while the engine is built; the worker threads
+only talk to the providers.
+"""
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from models import Provider, Zone, ZoneTarget
+from services.crypto import get_digest_key
+from services.provider_service import resolve_many
+from services.schema_registry import get_schema
+from services.sync_state import (
+    DEFAULT_VERIFY_INTERVAL_HOURS, TargetState, config_hash, load_states, zone_hash,
+)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_PROVIDER_CONCURRENCY = 2
+
+
+def load_provider_class(class_name: str):
+    """Import a provider class from its full path.
+
+    e.g. 'octodns_cloudflare.CloudflareProvider'
+    """
+    module_name, _, cls_name = class_name.rpartition('.')
+    module = importlib.import_module(module_name)
+    return getattr(module, cls_name)
+
+
+@dataclass
+class ZoneJob:
+    """One zone with its source and targets (provider ids)."""
+    name: str
+    source_id: int
+    target_ids: list[int]
+    lenient: bool = False
+    zone_id: Optional[int] = None
+
+
+@dataclass
+class TargetResult:
+    """Plan/apply outcome for one zone on one target."""
+    zone: str
+    target: str
+    changes: list[dict] = field(default_factory=list)
+    applied: int = 0
+    error: Optional[str] = None
+    zone_id: Optional[int] = None
+    target_id: Optional[int] = None
+    source_hash: Optional[str] = None
+    config_hash: Optional[str] = None
+    skipped: bool = False  # Unchanged since the last verified run
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a sync run."""
+    results: list[TargetResult] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        return not self.errors and all(r.error is None for r in self.results)
+
+    def to_diff(self) -> dict:
+        """Compact summary for SyncJob.diff_json.
+
+        Individual changes are stored in sync_changes (services.sync_changes).
+        """
+        return {
+            'changes': sum(len(r.changes) for r in self.results),
+            'applied': sum(r.applied for r in self.results),
+            'skipped': sum(1 for r in self.results if r.skipped),
+            'errors': [
+                {'zone': r.zone, 'target': r.target, 'error': r.error}
+                for r in self.results if r.error
+            ] + [{'error': e} for e in self.errors],
+        }
+
+
+def _describe_change(change) -> dict:
+    record = change.record
+    return {
+        'action': change.__class__.__name__.lower(),
+        'name': record.name,
+        'type': record._type,
+    }
+
+
+class SyncEngine:
+    """Plans (and optionally applies) a set of zones against their targets."""
+
+    def __init__(self, providers: dict[int, Provider], configs: dict[int, dict],
+                 zones: list[ZoneJob], dry_run: bool = True,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 log: Optional[Callable[[str], None]] = None,
+                 states: Optional[dict[tuple[int, int], TargetState]] = None,
+                 full_sync: bool = False,
+                 verify_interval: timedelta = timedelta(hours=DEFAULT_VERIFY_INTERVAL_HOURS),
+                 source_cache=None, use_cached_sources: bool = False):
+        self.providers = providers
+        self.configs = configs
+        self.zones = zones
+        self.dry_run = dry_run
+        self.max_workers = max_workers
+        self.states = states or {}
+        self.full_sync = full_sync
+        self.verify_interval = verify_interval
+        self.source_cache = source_cache
+        self.use_cached_sources = use_cached_sources
+        digest_key = get_digest_key()
+        self._config_hashes = {provider_id: config_hash(config, digest_key)
+                               for provider_id, config in configs.items()}
+        self.log = log or (lambda line: None)
+        self._lock = threading.Lock()
+        self._instances: dict[int, object] = {}
+        self._limits: dict[int, threading.BoundedSemaphore] = {
+            provider_id: threading.BoundedSemaphore(self._concurrency(provider))
+            for provider_id, provider in providers.items()
+        }
+
+    @staticmethod
+    def _concurrency(provider: Provider) -> int:
+        schema = get_schema(provider.provider_type)
+        if schema and schema.concurrency:
+            return schema.concurrency
+        return DEFAULT_PROVIDER_CONCURRENCY
+
+    @classmethod
+    def for_zones(cls, zone_names: Optional[list[str]] = None, **kwargs) -> 'SyncEngine':
+        """Build an engine from the database.
+
+        Args:
+            zone_names: Zones to sync, or None for all zones.
+            **kwargs: Passed on to the constructor.
+        """
+        query = Zone.query.order_by(Zone.name)
+        if zone_names:
+            query = query.filter(Zone.name.in_(zone_names))
+        zone_rows = query.all()
+        zone_ids = [z.id for z in zone_rows]
+
+        targets: dict[int, list[int]] = {}
+        if zone_ids:
+            for zone_id, target_id in ZoneTarget.query.with_entities(
+                    ZoneTarget.zone_id, ZoneTarget.target_id).filter(ZoneTarget.zone_id.in_(zone_ids)):
+                targets.setdefault(zone_id, []).append(target_id)
+
+        zones = [
+            ZoneJob(name=z.name, source_id=z.source_id, target_ids=targets.get(z.id, []),
+                    lenient=bool((z.options_json or {}).get('lenient', False)), zone_id=z.id)
+            for z in zone_rows
+        ]
+
+        provider_ids = {z.source_id for z in zones} | {t for z in zones for t in z.target_ids}
+        providers = {p.id: p for p in Provider.query.filter(Provider.id.in_(provider_ids))} \
+            if provider_ids else {}
+        configs, missing = resolve_many(providers.values())
+        if missing:
+            raise ValueError(f"Missing secrets: {', '.join(missing)}")
+
+        if not kwargs.get('full_sync'):
+            kwargs.setdefault('states', load_states(zone_ids))
+
+        return cls(providers, configs, zones, **kwargs)
+
+    def _instance(self, provider_id: int):
+        """Get the (shared) provider instance, creating it on first use."""
+        with self._lock:
+            instance = self._instances.get(provider_id)
+            if instance is None:
+                provider = self.providers[provider_id]
+                provider_cls = load_provider_class(provider.provider_type)
+                config = {k: v for k, v in self.configs[provider_id].items()
+                          if v is not None and v != ''}
+                instance = provider_cls(provider.name, **config)
+                self._instances[provider_id] = instance
+            return instance
+
+    def _fetch(self, source_id: int, zone_name: str, lenient: bool):
+        """Populate a zone from its source.
+
+        Returns:
+            Tuple of (zone, source_hash).
+        """
+        from octodns.zone import Zone as OctoZone
+
+        source = self._instance(source_id)
+        source_name = self.providers[source_id].name
+        config_hash = self._config_hashes[source_id]
+        if self.source_cache is not None and self.use_cached_sources:
+            zone = self.source_cache.get(source_id, config_hash, zone_name, source=source,
+                                         lenient=lenient)
+            if zone is not None:
+                self.log(f"{zone_name}: {len(zone.records)} records from {source_name} (snapshot)")
+                return zone, zone_hash(zone)
+
+        zone = OctoZone(zone_name, [])
+        with self._limits[source_id]:
+            source.populate(zone, lenient=lenient)
+        self.log(f"{zone_name}: {len(zone.records)} records from {source_name}")
+        if self.source_cache is not None:
+            self.source_cache.put(source_id, config_hash, zone)
+        return zone, zone_hash(zone)
+
+    def _is_current(self, zone_job: ZoneJob, target_id: int, source_hash: str, now: datetime) -> bool:
+        if self.full_sync:
+            return False
+        state = self.states.get((zone_job.zone_id, target_id))
+        return state is not None and state.is_current(
+            source_hash, self._config_hashes[target_id], self.verify_interval, now)
+
+    def _plan_apply(self, zone, target_id: int, zone_id: Optional[int] = None,
+                    source_hash: Optional[str] = None) -> TargetResult:
+        target_name = self.providers[target_id].name
+        result = TargetResult(zone=zone.name, target=target_name, zone_id=zone_id,
+                              target_id=target_id, source_hash=source_hash,
+                              config_hash=self._config_hashes[target_id])
+        try:
+            target = self._instance(target_id)
+            with self._limits[target_id]:
+                plan = target.plan(zone.copy())
+                if plan is None or not plan.changes:
+                    self.log(f"{zone.name} -> {target_name}: no changes")
+                    return result
+                result.changes = [_describe_change(c) for c in plan.changes]
+                self.log(f"{zone.name} -> {target_name}: {len(plan.changes)} change(s)")
+                if not self.dry_run:
+                    plan.raise_if_unsafe()
+                    result.applied = target.apply(plan)
+                    self.log(f"{zone.name} -> {target_name}: applied {result.applied} change(s)")
+        except Exception as e:
+            result.error = str(e)
+            self.log(f"{zone.name} -> {target_name}: ERROR {e}")
+        return result
+
+    def run(self) -> SyncResult:
+        """Run the sync.
+
+        Source fetches are deduplicated per (source, zone); as soon as a zone
+        is populated its targets are planned concurrently.
+        """
+        result = SyncResult()
+        zones = [z for z in self.zones if z.target_ids]
+        if not zones:
+            self.log("No zones with targets to sync")
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='octodns-sync') as executor:
+            fetches = {}
+            for zone_job in zones:
+                key = (zone_job.source_id, zone_job.name)
+                if key not in fetches:
+                    fetches[key] = executor.submit(self._fetch, zone_job.source_id,
+                                                   zone_job.name, zone_job.lenient)
+
+            by_fetch = {}
+            for zone_job in zones:
+                by_fetch.setdefault(fetches[(zone_job.source_id, zone_job.name)], []).append(zone_job)
+
+            plans = []
+            now = datetime.utcnow()
+            for future in as_completed(by_fetch):
+                try:
+                    zone, source_hash = future.result()
+                except Exception as e:
+                    for zone_job in by_fetch[future]:
+                        source_name = self.providers[zone_job.source_id].name
+                        result.errors.append(f"{zone_job.name}: fetch from {source_name} failed: {e}")
+                        self.log(f"{zone_job.name}: ERROR fetching from {source_name}: {e}")
+                    continue
+                for zone_job in by_fetch[future]:
+                    for target_id in zone_job.target_ids:
+                        if self._is_current(zone_job, target_id, source_hash, now):
+                            target_name = self.providers[target_id].name
+                            self.log(f"{zone.name} -> {target_name}: unchanged, skipped")
+                            result.results.append(TargetResult(
+                                zone=zone.name, target=target_name, zone_id=zone_job.zone_id,
+                                target_id=target_id, skipped=True))
+                            continue
+                        plans.append(executor.submit(self._plan_apply, zone, target_id,
+                                                     zone_job.zone_id, source_hash))
+
+            for future in as_completed(plans):
+                result.results.append(future.result())
+
+        result.results.sort(key=lambda r: (r.zone, r.target))
+        return result
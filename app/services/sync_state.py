@@ -0,0 +1,138 @@
+"""Per zone and target sync state for incremental syncs.
+
+After every plan the engine records a hash of the source records and of
+the target config. The next run skips a target when both hashes are
+unchanged, the target was in sync afterwards and it was verified (planned
+against the provider) within the verify interval. Full syncs ignore the
+stored state.
+
+The engine only sees immutable TargetState snapshots; this module does
+all database access.
+"""
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from extensions import db
+from models import ZoneSyncState
+
+DEFAULT_VERIFY_INTERVAL_HOURS = 24
+
+
+@dataclass(frozen=True)
+class TargetState:
+    """Snapshot of a ZoneSyncState row."""
+    source_hash: Optional[str]
+    config_hash: Optional[str]
+    in_sync: bool
+    verified_at: Optional[datetime]
+
+    def is_current(self, source_hash: str, config_hash: str, verify_interval: timedelta,
+                   now: Optional[datetime] = None) -> bool:
+        """True if planning this target again would find nothing to do."""
+        if not self.in_sync or self.verified_at is None:
+            return False
+        if self.source_hash != source_hash or self.config_hash != config_hash:
+            return False
+        return (now or datetime.utcnow()) - self.verified_at < verify_interval
+
+
+def _digest(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def zone_hash(zone) -> str:
+    """Hash the records of a populated octoDNS zone (order-independent)."""
+    records = sorted(
+        ((record.name, record._type, record.data) for record in zone.records),
+        key=lambda r: (r[0], r[1]),
+    )
+    return _digest([zone.name, records])
+
+
+def config_hash(config: dict, key: bytes) -> str:
+    """HMAC of a resolved provider config.
+
+    The config contains the decrypted secrets. A plain hash of it would let
+    short secrets be brute-forced from a copy of the database, so the hash
+    is keyed (services.crypto.get_digest_key()).
+    """
+    payload = json.dumps(config, sort_keys=True, default=str).encode()
+    return hmac.new(key, payload, hashlib.sha256).hexdigest()
+
+
+def plan_hash(changes: list[dict]) -> str:
+    return _digest(sorted((c['action'], c['name'], c['type']) for c in changes))
+
+
+def load_states(zone_ids: Iterable[int]) -> dict[tuple[int, int], TargetState]:
+    """Load the states of the given zones, keyed by (zone_id, target_id)."""
+    zone_ids = list(zone_ids)
+    if not zone_ids:
+        return {}
+    rows = ZoneSyncState.query.filter(ZoneSyncState.zone_id.in_(zone_ids))
+    return {
+        (row.zone_id, row.target_id): TargetState(
+            source_hash=row.source_hash,
+            config_hash=row.config_hash,
+            in_sync=bool(row.in_sync),
+            verified_at=row.verified_at,
+        )
+        for row in rows
+    }
+
+
+def save_states(job_id: int, results: Iterable, dry_run: bool) -> int:
+    """Record the outcome of planned targets.
+
+    Skipped targets and targets with errors keep their previous state.
+    Call before committing the job.
+
+    Args:
+        job_id: SyncJob id.
+        results: sync_engine.TargetResult objects.
+        dry_run: Whether changes were only planned.
+
+    Returns:
+        Number of updated states.
+    """
+    results = [r for r in results if not r.skipped and r.error is None and r.zone_id is not None]
+    if not results:
+        return 0
+
+    existing = {
+        (row.zone_id, row.target_id): row
+        for row in ZoneSyncState.query.filter(
+            ZoneSyncState.zone_id.in_({r.zone_id for r in results}))
+    }
+
+    now = datetime.utcnow()
+    for result in results:
+        row = existing.get((result.zone_id, result.target_id))
+        if row is None:
+            row = ZoneSyncState(zone_id=result.zone_id, target_id=result.target_id)
+            db.session.add(row)
+        row.source_hash = result.source_hash
+        row.config_hash = result.config_hash
+        row.last_job_id = job_id
+        row.verified_at = now
+        if result.changes:
+            row.plan_hash = plan_hash(result.changes)
+        if result.changes and not dry_run:
+            row.applied_at = now
+        # A dry-run with pending changes leaves the target out of sync
+        row.in_sync = not result.changes or not dry_run
+    return len(results)
+
+
+def clear_states(zone_id: Optional[int] = None, target_id: Optional[int] = None) -> int:
+    """Forget stored states so the next sync plans those targets again."""
+    query = ZoneSyncState.query
+    if zone_id is not None:
+        query = query.filter_by(zone_id=zone_id)
+    if target_id is not None:
+        query = query.filter_by(target_id=target_id)
+    return query.delete(synchronize_session=False)
@@ -0,0 +1,211 @@
+"""Automatic sync triggers: interval scheduler and webhooks.
+
+Webhook events are debounced: the first event queues a pending job that
+only starts after the debounce window. Every further event folds into that
+job, merging its zones and moving the start time out again, capped by a
+maximum delay so a steady stream of events still syncs. Only one such
+job is pending at a time; events arriving while it runs fold into a
+single follow-up job.
+
+The scheduler runs in the process that dispatches sync jobs (see
+JobRunner.add_tick) and queues a sync every ``sync_schedule_minutes``.
+"""
+import hashlib
+import hmac
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from extensions import db
+from models import SyncJob, Zone
+from services.job_runner import STATUS_PENDING, job_runner
+from services.options_service import get_options
+from services.process_lock import FileLock
+
+AUTO_TRIGGERS = ('webhook', 'schedule')
+
+DEFAULT_DEBOUNCE_SECONDS = 30
+DEFAULT_MAX_DELAY_SECONDS = 300
+
+
+def normalize_zone_name(name: str) -> str:
+    """'Example.com' -> 'example.com.'"""
+    name = (name or '').strip().lower()
+    return name if not name or name.endswith('.') else f'{name}.'
+
+
+def _merge_scope(scope: Optional[dict], zones: Optional[list[str]], full_sync: bool) -> Optional[dict]:
+    """Union of two job scopes; None (all zones) absorbs everything."""
+    scope = dict(scope or {})
+    if not scope.get('zones') or not zones:
+        scope.pop('zones', None)
+    else:
+        scope['zones'] = sorted(set(scope['zones']) | set(zones))
+    if full_sync:
+        scope['full'] = True
+    return scope or None
+
+
+class TriggerService:
+    """Debounced, coalescing job creation for webhooks and the scheduler."""
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._file_lock: Optional[FileLock] = None
+        self._next_schedule: Optional[datetime] = None
+
+    def init_app(self, app):
+        self.app = app
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self._file_lock = FileLock(os.path.join(zone_path, '.triggers.lock'))
+        job_runner.add_tick(self.tick)
+        app.extensions['triggers'] = self
+
+    # -- Settings -------------------------------------------------------
+
+    def _setting(self, name: str, default=None):
+        value = get_options().get(name)
+        if value is None:
+            value = self.app.config.get(name.upper(), os.environ.get(name.upper()))
+        return default if value in (None, '') else value
+
+    @property
+    def debounce(self) -> timedelta:
+        return timedelta(seconds=float(self._setting('webhook_debounce_seconds', DEFAULT_DEBOUNCE_SECONDS)))
+
+    @property
+    def max_delay(self) -> timedelta:
+        return timedelta(seconds=float(self._setting('webhook_max_delay_seconds', DEFAULT_MAX_DELAY_SECONDS)))
+
+    @property
+    def schedule_interval(self) -> Optional[timedelta]:
+        minutes = float(self._setting('sync_schedule_minutes', 0))
+        return timedelta(minutes=minutes) if minutes > 0 else None
+
+    # -- Webhooks -------------------------------------------------------
+
+    def webhook_token(self) -> Optional[str]:
+        token = self._setting('webhook_token')
+        return str(token) if token else None
+
+    def verify_request(self, headers, body: bytes) -> bool:
+        """Check a webhook request against the configured token.
+
+        Accepted: 'Authorization: Bearer <token>', 'X-Webhook-Token: <token>'
+        or NetBox' 'X-Hook-Signature' (HMAC-SHA512 of the body with the token
+        as secret).
+        """
+        token = self.webhook_token()
+        if not token:
+            return False
+
+        signature = headers.get('X-Hook-Signature')
+        if signature:
+            expected = hmac.new(token.encode(), body, hashlib.sha512).hexdigest()
+            return hmac.compare_digest(signature.strip().lower(), expected)
+
+        auth = headers.get('Authorization', '')
+        given = auth[7:].strip() if auth.lower().startswith('bearer ') else headers.get('X-Webhook-Token', '')
+        return bool(given) and hmac.compare_digest(given.encode(), token.encode())
+
+    @staticmethod
+    def zones_from_payload(payload) -> Optional[list[str]]:
+        """Extract the affected zones from a webhook payload.
+
+        Supports {"zones": [...]}, {"zone": "..."} and NetBox DNS events
+        for zones and records. Returns None if the payload names no zone,
+        meaning all zones.
+        """
+        if not isinstance(payload, dict):
+            return None
+        if isinstance(payload.get('zones'), list):
+            return [normalize_zone_name(z) for z in payload['zones'] if isinstance(z, str)] or None
+        if isinstance(payload.get('zone'), str):
+            return [normalize_zone_name(payload['zone'])]
+
+        data = payload.get('data')
+        if isinstance(data, dict):
+            if payload.get('model') == 'zone' and isinstance(data.get('name'), str):
+                return [normalize_zone_name(data['name'])]
+            zone = data.get('zone')
+            if isinstance(zone, dict) and isinstance(zone.get('name'), str):
+                return [normalize_zone_name(zone['name'])]
+        return None
+
+    # -- Job creation ---------------------------------------------------
+
+    def submit(self, trigger_type: str, zones: Optional[Iterable[str]] = None,
+               full_sync: bool = False,
+               debounce: Optional[timedelta] = None) -> tuple[Optional[SyncJob], bool]:
+        """Queue a debounced sync or fold it into the pending one.
+
+        Args:
+            trigger_type: 'webhook' or 'schedule'.
+            zones: Affected zone names, or None for all zones.
+            full_sync: Plan every target.
+            debounce: Wait before starting; defaults to the webhook window.
+
+        Returns:
+            Tuple of (job, created). created is False if the trigger was
+            merged into an already pending job; job is None if none of the
+            given zones is managed here.
+        """
+        now = datetime.utcnow()
+        debounce = self.debounce if debounce is None else debounce
+        if zones is not None:
+            known = {name for (name,) in db.session.query(Zone.name)}
+            zones = sorted({z for z in zones if z in known})
+            if not zones:
+                # Nothing we manage changed
+                return None, False
+
+        with self._lock, self._file_lock:
+            pending = SyncJob.query.filter(
+                SyncJob.status == STATUS_PENDING,
+                SyncJob.trigger_type.in_(AUTO_TRIGGERS),
+                SyncJob.dry_run.is_(False),
+            ).order_by(SyncJob.created_at).first()
+
+            if pending is not None:
+                run_after = min(now + debounce, pending.created_at + self.max_delay)
+                scope = _merge_scope(pending.scope_json, zones, full_sync)
+                # Conditional update: the dispatcher may claim the job meanwhile
+                updated = SyncJob.query.filter_by(id=pending.id, status=STATUS_PENDING).update(
+                    {'scope_json': scope, 'run_after': max(run_after, pending.run_after or now)},
+                    synchronize_session=False,
+                )
+                db.session.commit()
+                if updated:
+                    db.session.refresh(pending)
+                    return pending, False
+
+            job = job_runner.enqueue(trigger_type=trigger_type, dry_run=False, zones=zones,
+                                     full_sync=full_sync, run_after=now + debounce)
+            return job, True
+
+    # -- Scheduler ------------------------------------------------------
+
+    def tick(self):
+        """Queue the scheduled sync when it is due (called by the job runner)."""
+        interval = self.schedule_interval
+        if interval is None:
+            self._next_schedule = None
+            return
+
+        now = datetime.utcnow()
+        if self._next_schedule is None:
+            last = SyncJob.query.filter_by(trigger_type='schedule') \
+                .order_by(SyncJob.created_at.desc()).first()
+            self._next_schedule = last.created_at + interval if last else now
+        if now < self._next_schedule:
+            return
+
+        full_sync = str(self._setting('sync_schedule_full', False)).lower() in ('1', 'true', 'yes', 'on')
+        self.submit('schedule', zones=None, full_sync=full_sync, debounce=timedelta(0))
+        self._next_schedule = now + interval
+        self.app.logger.info(f"Scheduled sync queued, next at {self._next_schedule:%H:%M:%S} UTC")
+
+
+triggers = TriggerService()
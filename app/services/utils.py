@@ -0,0 +1,39 @@
+"""Small helpers shared by several services."""
+import os
+import tempfile
+from types import MappingProxyType
+
+import yaml
+
+# libyaml parses several times faster than the pure Python loader
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+HAS_LIBYAML = SafeLoader is not yaml.SafeLoader
+
+
+def freeze(value):
+    """Recursively convert dicts/lists into read-only equivalents."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def write_atomic(path: str, content: str | bytes):
+    """Write a file via a temp file and rename, so readers never see partial content."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.tmp')
+    try:
+        binary = isinstance(content, bytes)
+        with os.fdopen(fd, 'wb' if binary else 'w', encoding=None if binary else 'utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,333 @@
+"""Pre-sync validation of the zone files.
+
+Every zone is checked like octoDNS would load it (the record model of
+octoDNS with all its value validation) and against the record types each
+of its targets supports (SUPPORTS and SUPPORTS_ROOT_NS of the discovered
+provider classes). Manual syncs are only queued and jobs only run when no
+zone has errors.
+
+Validation is CPU bound, so zones run in a process pool
+(``VALIDATION_WORKERS``, the actual check lives in
+services.record_validation). Results are cached per zone by the SHA-256
+of the file content and the validation parameters; the hash itself is
+memoized per (mtime, size), so re-validating unchanged zones costs one
+stat() each.
+
+Only zones with a YamlProvider source can be checked locally (its
+``directory``, else the GUI's zone directory); zones of other sources
+are reported as not checked. A missing file of a YamlProvider source is
+an error, since octoDNS would fail on it as well.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Optional
+
+from models import Provider, Zone, ZoneTarget
+from services.provider_discovery import get_descriptor
+from services.provider_service import resolve_config
+from services.record_validation import validate_zone_file
+from services.zone_files import zone_file_name, zone_files_dir
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_CACHE_SIZE = 512
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SEVERITY_ERROR = 'error'
+SEVERITY_WARNING = 'warning'
+
+
+@dataclass(frozen=True)
+class Issue:
+    """One problem found in a zone."""
+    severity: str
+    record: str
+    target: Optional[str]
+    message: str
+
+
+@dataclass
+class ZoneValidation:
+    """Validation result of one zone."""
+    zone: str
+    checked: bool = True
+    records: int = 0
+    issues: list[Issue] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def errors(self) -> list[Issue]:
+        return [i for i in self.issues if i.severity == SEVERITY_ERROR]
+
+    @property
+    def warnings(self) -> list[Issue]:
+        return [i for i in self.issues if i.severity == SEVERITY_WARNING]
+
+
+@dataclass
+class ValidationReport:
+    """Validation result of several zones."""
+    zones: list[ZoneValidation]
+
+    @property
+    def errors(self) -> int:
+        return sum(len(z.errors) for z in self.zones)
+
+    @property
+    def warnings(self) -> int:
+        return sum(len(z.warnings) for z in self.zones)
+
+    @property
+    def ok(self) -> bool:
+        return self.errors == 0
+
+    def error_lines(self) -> list[str]:
+        """'example.com.: www A [target]: message' for every error."""
+        return [
+            f"{z.zone}: {i.record or '-'}{f' [{i.target}]' if i.target else ''}: {i.message}"
+            for z in self.zones for i in z.errors
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            'ok': self.ok,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'zones': {
+                z.zone: [[i.severity, i.record, i.target, i.message] for i in z.issues]
+                for z in self.zones if z.issues
+            },
+        }
+
+
+def _is_yaml_provider(provider: Provider) -> bool:
+    return provider.provider_type.rsplit('.', 1)[-1] == 'YamlProvider'
+
+
+def _flag(config: dict, name: str, default: bool) -> bool:
+    value = config.get(name)
+    if value is None or value == '':
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _target_task(provider: Provider) -> dict:
+    descriptor = get_descriptor(provider.provider_type)
+    return {
+        'name': provider.name,
+        'supports': list(descriptor.supports) if descriptor and descriptor.supports is not None else None,
+        'root_ns': descriptor.flags.get('SUPPORTS_ROOT_NS') if descriptor else None,
+        'strict': _flag(provider.config_json or {}, 'strict_supports', True),
+    }
+
+
+class ZoneValidator:
+    """Validates zone files in bulk with a content-hash result cache."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.directory: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._results: OrderedDict[str, dict] = OrderedDict()
+        self._digests: dict[str, tuple[tuple[int, int], str]] = {}
+
+    def init_app(self, app):
+        self.directory = zone_files_dir(app)
+        workers = app.config.get('VALIDATION_WORKERS', os.environ.get('VALIDATION_WORKERS'))
+        self.max_workers = int(workers) if workers not in (None, '') \
+            else min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+        self.cache_size = int(app.config.get('VALIDATION_CACHE_SIZE', self.cache_size))
+        self.logger = app.logger
+        app.extensions['validator'] = self
+
+    # -- Tasks ----------------------------------------------------------
+
+    def _zone_path(self, zone: Zone, source_config: dict) -> str:
+        """File a YamlProvider source reads the zone from."""
+        directory = source_config.get('directory') or self.directory
+        return os.path.join(str(directory), zone_file_name(zone.name))
+
+    def _tasks(self, zone_names: Optional[list[str]]) -> tuple[list[dict], list[str], dict[str, str]]:
+        """Build the worker tasks from the database.
+
+        Returns:
+            Tuple of (tasks, names of zones without a YAML source,
+            zone name -> path of YAML source files that do not exist).
+        """
+        query = Zone.query.order_by(Zone.name)
+        if zone_names:
+            query = query.filter(Zone.name.in_(zone_names))
+        zones = query.all()
+        if not zones:
+            return [], [], {}
+
+        targets: dict[int, list[int]] = {}
+        for zone_id, target_id in ZoneTarget.query.with_entities(
+                ZoneTarget.zone_id, ZoneTarget.target_id).filter(ZoneTarget.zone_id.in_([z.id for z in zones])):
+            targets.setdefault(zone_id, []).append(target_id)
+
+        provider_ids = {z.source_id for z in zones} | {t for ids in targets.values() for t in ids}
+        providers = {p.id: p for p in Provider.query.filter(Provider.id.in_(provider_ids))}
+        # Any provider used as a target is checked as one, even if it is flagged as a source
+        target_ids = {t for ids in targets.values() for t in ids}
+        target_tasks = {pid: _target_task(providers[pid]) for pid in target_ids if pid in providers}
+        # Only the (non-secret) directory of YAML sources is needed
+        source_configs = {pid: resolve_config(p.config_json)[0]
+                          for pid, p in providers.items() if _is_yaml_provider(p)}
+
+        tasks, unchecked, missing = [], [], {}
+        for zone in zones:
+            source_config = source_configs.get(zone.source_id)
+            if source_config is None:
+                unchecked.append(zone.name)
+                continue
+            path = self._zone_path(zone, source_config)
+            if not os.path.isfile(path):
+                missing[zone.name] = path
+                continue
+            tasks.append({
+                'zone': zone.name,
+                'path': path,
+                'lenient': bool((zone.options_json or {}).get('lenient', False)),
+                'enforce_order': _flag(source_config, 'enforce_order', True),
+                'targets': [target_tasks[t] for t in sorted(targets.get(zone.id, [])) if t in target_tasks],
+            })
+        return tasks, unchecked, missing
+
+    # -- Cache ----------------------------------------------------------
+
+    def _digest(self, path: str) -> Optional[str]:
+        """SHA-256 of a file, re-hashed only when mtime or size changed."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            memo = self._digests.get(path)
+        if memo is not None and memo[0] == signature:
+            return memo[1]
+
+        sha = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+        except OSError:
+            return None
+        digest = sha.hexdigest()
+        with self._lock:
+            self._digests[path] = (signature, digest)
+        return digest
+
+    @staticmethod
+    def _cache_key(task: dict, digest: str) -> str:
+        params = {k: v for k, v in task.items() if k != 'path'}
+        return hashlib.sha256(f'{digest}:{json.dumps(params, sort_keys=True)}'.encode()).hexdigest()
+
+    def _cached(self, key: str) -> Optional[dict]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def _store(self, key: str, result: dict):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._digests.clear()
+
+    # -- Validation -----------------------------------------------------
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process with running threads is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def _run(self, tasks: list[dict]) -> list[dict]:
+        if len(tasks) < 2 or self.max_workers < 2:
+            return [validate_zone_file(task) for task in tasks]
+        try:
+            return list(self._executor().map(validate_zone_file, tasks))
+        except BrokenProcessPool:
+            self.logger.warning("Validation pool broke, validating in-process")
+            with self._lock:
+                self._pool = None
+            return [validate_zone_file(task) for task in tasks]
+
+    def validate(self, zone_names: Optional[list[str]] = None) -> ValidationReport:
+        """Validate zones and their targets' record type support.
+
+        Must run inside an app context.
+
+        Args:
+            zone_names: Zones to check, or None for all zones.
+        """
+        tasks, unchecked, missing = self._tasks(zone_names)
+
+        results: dict[str, tuple[dict, bool]] = {}
+        misses, keys = [], {}
+        for task in tasks:
+            digest = self._digest(task['path'])
+            key = self._cache_key(task, digest) if digest else None
+            cached = self._cached(key) if key else None
+            if cached is not None:
+                results[task['zone']] = (cached, True)
+            else:
+                misses.append(task)
+                keys[task['zone']] = key
+
+        for task, result in zip(misses, self._run(misses)):
+            results[task['zone']] = (result, False)
+            if keys[task['zone']]:
+                self._store(keys[task['zone']], result)
+
+        zones = [
+            ZoneValidation(zone=task['zone'], records=results[task['zone']][0]['records'],
+                           issues=[Issue(*issue) for issue in results[task['zone']][0]['issues']],
+                           cached=results[task['zone']][1])
+            for task in tasks
+        ]
+        zones.extend(ZoneValidation(zone=name, checked=False) for name in unchecked)
+        zones.extend(
+            ZoneValidation(zone=name, issues=[Issue(SEVERITY_ERROR, '', None, f'Zone-Datei fehlt: {path}')])
+            for name, path in missing.items()
+        )
+        zones.sort(key=lambda z: z.zone)
+
+        report = ValidationReport(zones)
+        if misses:
+            self.logger.info(f"Validated {len(misses)} zone(s), {len(tasks) - len(misses)} cached: "
+                             f"{report.errors} error(s), {report.warnings} warning(s)")
+        return report
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+validator = ZoneValidator()
@@ -0,0 +1,47 @@
+"""Location and naming of the octoDNS YAML zone files.
+
+Zone files live in <ZONE_FILE_PATH>/zones (ZONE_FILES_DIR overrides it)
+and are named like octoDNS' YamlProvider expects: '<zone name>yaml',
+e.g. 'example.com.yaml'.
+"""
+import os
+from typing import Optional
+
+from flask import current_app
+
+ZONE_FILES_DIRNAME = 'zones'
+ZONE_FILE_SUFFIX = 'yaml'
+
+
+def zone_files_dir(app=None) -> str:
+    """Directory with the zone files."""
+    config = (app or current_app).config
+    return config.get('ZONE_FILES_DIR') or \
+        os.path.join(config.get('ZONE_FILE_PATH', '/config/octodns'), ZONE_FILES_DIRNAME)
+
+
+def zone_file_name(zone_name: str) -> str:
+    """'example.com.' -> 'example.com.yaml'"""
+    return f'{zone_name}{ZONE_FILE_SUFFIX}'
+
+
+def zone_name_from_file(filename: str) -> Optional[str]:
+    """'example.com.yaml' -> 'example.com.', None for other files."""
+    if not filename.endswith(f'.{ZONE_FILE_SUFFIX}') or filename.startswith('.'):
+        return None
+    name = filename[:-len(ZONE_FILE_SUFFIX)]
+    return name if len(name) > 1 else None
+
+
+def list_zone_files(directory: str) -> dict[str, os.DirEntry]:
+    """Zone files in a directory, keyed by zone name."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return {}
+    files = {}
+    for entry in entries:
+        name = zone_name_from_file(entry.name)
+        if name and entry.is_file():
+            files[name] = entry
+    return files
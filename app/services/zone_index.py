@@ -0,0 +1,290 @@
+"""Search index over the zone files.
+
+Record names and values of all zone files are kept in an inverted table
+(zone_index_entries) in the regular database, so finding the zone of a
+hostname or IP is a single indexed prefix query instead of parsing every
+file. The index is refreshed incrementally: only files whose mtime or
+size changed are parsed again, deleted files are dropped.
+
+Refreshes run at most every ``check_interval`` seconds, from the job
+runner's dispatcher; searches only query the index and never parse zone
+files on the request thread. An inter-process lock keeps several workers
+from indexing the same files at once.
+
+Prefix searches are range queries on term, which need a binary collation
+(SQLite's default; the column declares utf8mb4_bin on MariaDB).
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import yaml
+from sqlalchemy import delete
+
+from extensions import db
+from models import ZoneIndexEntry, ZoneIndexFile
+from services.process_lock import FileLock
+from services.zone_files import list_zone_files, zone_files_dir
+from services.zone_loader import iter_zone_records
+
+DEFAULT_CHECK_INTERVAL = 5.0
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+INSERT_BATCH_SIZE = 1000
+TERM_LENGTH = 255
+
+# Keys of structured values (MX, SRV, CAA, ...) worth searching
+VALUE_KEYS = ('value', 'exchange', 'target', 'nsdname', 'address', 'replacement')
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A record matching a search."""
+    zone: str
+    name: str
+    type: str
+    value: Optional[str]
+    fqdn: str
+    exact: bool
+
+
+@dataclass(frozen=True)
+class RefreshResult:
+    """Outcome of an index refresh."""
+    indexed: int
+    removed: int
+    entries: int
+    seconds: float
+
+
+def _record_values(data: dict) -> list[str]:
+    """Searchable values of one record, e.g. IPs and target hostnames."""
+    raw = data.get('values')
+    if raw is None:
+        raw = [data['value']] if data.get('value') is not None else []
+    elif not isinstance(raw, list):
+        raw = [raw]
+
+    values = []
+    for item in raw:
+        if isinstance(item, dict):
+            values.extend(str(item[key]) for key in VALUE_KEYS if item.get(key) is not None)
+        elif item is not None:
+            values.append(str(item))
+    return values
+
+
+def iter_index_rows(file_id: int, zone_name: str, zone_records):
+    """Yield the index rows for iter_zone_records() output."""
+    for name, records in zone_records:
+        name = '' if name is None else str(name)
+        fqdn = f'{name}.{zone_name}' if name else zone_name
+        for record in records if isinstance(records, list) else [records]:
+            if not isinstance(record, dict) or not record.get('type'):
+                continue
+            record_type = str(record['type'])[:10]
+            values = _record_values(record)
+            yield {
+                'file_id': file_id, 'term': fqdn.lower()[:TERM_LENGTH], 'kind': 'fqdn',
+                'record_name': name[:TERM_LENGTH], 'record_type': record_type,
+                'value': values[0][:TERM_LENGTH] if values else None,
+            }
+            for value in values:
+                yield {
+                    'file_id': file_id, 'term': value.lower()[:TERM_LENGTH], 'kind': 'value',
+                    'record_name': name[:TERM_LENGTH], 'record_type': record_type,
+                    'value': value[:TERM_LENGTH],
+                }
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with prefix.
+
+    Returns:
+        The bound, or None if there is none (prefix consists of U+10FFFF only).
+    """
+    # The last code point cannot be incremented; drop it and bump the one before
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Surrogates cannot be encoded for the database; skip past them
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+class ZoneIndex:
+    """Incrementally maintained zone search index."""
+
+    def __init__(self, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.directory: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._file_lock: Optional[FileLock] = None
+        self._checked_at = 0.0
+
+    def init_app(self, app):
+        self.directory = zone_files_dir(app)
+        self.check_interval = float(app.config.get('ZONE_INDEX_CHECK_INTERVAL', self.check_interval))
+        self.logger = app.logger
+        zone_path = app.config.get('ZONE_FILE_PATH', '/config/octodns')
+        self._file_lock = FileLock(os.path.join(zone_path, '.zone-index.lock'))
+
+        from services.job_runner import job_runner
+        job_runner.add_tick(self.refresh)
+        app.extensions['zone_index'] = self
+
+    def refresh(self, force: bool = False) -> Optional[RefreshResult]:
+        """Re-index changed zone files.
+
+        Must run inside an app context. Returns None if the check interval
+        has not passed or another thread or process is refreshing.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            if not self._file_lock.acquire(blocking=False):
+                return None
+            try:
+                result = self._refresh()
+            finally:
+                self._file_lock.release()
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+        if result.indexed or result.removed:
+            self.logger.info(f"Zone index: {result.indexed} file(s) indexed, {result.removed} removed, "
+                             f"{result.entries} entries in {result.seconds:.2f}s")
+        return result
+
+    def _refresh(self) -> RefreshResult:
+        start = time.monotonic()
+        files = list_zone_files(self.directory)
+        known = {row.zone_name: row for row in ZoneIndexFile.query}
+
+        removed = [row.id for name, row in known.items() if name not in files]
+        if removed:
+            db.session.execute(delete(ZoneIndexEntry).where(ZoneIndexEntry.file_id.in_(removed)))
+            db.session.execute(delete(ZoneIndexFile).where(ZoneIndexFile.id.in_(removed)))
+            db.session.commit()
+
+        indexed = entries = 0
+        for zone_name, entry in sorted(files.items()):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            row = known.get(zone_name)
+            if row is not None and (row.mtime_ns, row.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            entries += self._index_file(zone_name, entry.path, stat, row)
+            indexed += 1
+
+        return RefreshResult(indexed=indexed, removed=len(removed), entries=entries,
+                             seconds=time.monotonic() - start)
+
+    @staticmethod
+    def _file_row(zone_name: str, stat, row: Optional[ZoneIndexFile]) -> ZoneIndexFile:
+        if row is None:
+            row = ZoneIndexFile(zone_name=zone_name)
+        row.mtime_ns = stat.st_mtime_ns
+        row.size = stat.st_size
+        row.indexed_at = datetime.utcnow()
+        row.record_count = 0
+        row.error = None
+        db.session.add(row)
+        db.session.flush()
+        db.session.execute(delete(ZoneIndexEntry).where(ZoneIndexEntry.file_id == row.id))
+        return row
+
+    def _index_file(self, zone_name: str, path: str, stat, row: Optional[ZoneIndexFile]) -> int:
+        """Replace the entries of one zone file in a single transaction."""
+        row = self._file_row(zone_name, stat, row)
+        entries = records = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                batch = []
+                for entry in iter_index_rows(row.id, zone_name, iter_zone_records(f)):
+                    batch.append(entry)
+                    records += entry['kind'] == 'fqdn'
+                    if len(batch) >= INSERT_BATCH_SIZE:
+                        self._insert(batch)
+                        entries += len(batch)
+                        batch = []
+                self._insert(batch)
+                entries += len(batch)
+        except (OSError, UnicodeDecodeError, yaml.YAMLError) as e:
+            self.logger.warning(f"Zone index: cannot parse {path}: {e}")
+            # Keep the file without entries so it is not parsed again until it changes
+            db.session.rollback()
+            row = self._file_row(zone_name, stat, ZoneIndexFile.query.filter_by(zone_name=zone_name).first())
+            row.error = str(e)[:255]
+            entries = records = 0
+
+        row.record_count = records
+        db.session.commit()
+        return entries
+
+    @staticmethod
+    def _insert(rows: list[dict]):
+        if rows:
+            # Core insert: no ORM bookkeeping for the (many) index rows
+            db.session.execute(ZoneIndexEntry.__table__.insert(), rows)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list[SearchHit]:
+        """Find records whose FQDN or value starts with query.
+
+        Exact matches come first. One hit per record, even if both its
+        name and a value match. limit is clamped to 1..MAX_LIMIT.
+        """
+        term = (query or '').strip().lower()
+        if not term:
+            return []
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        conditions = [ZoneIndexEntry.term >= term]
+        upper_bound = _prefix_upper_bound(term)
+        if upper_bound is not None:
+            conditions.append(ZoneIndexEntry.term < upper_bound)
+
+        rows = db.session.query(
+            ZoneIndexFile.zone_name,
+            ZoneIndexEntry.record_name,
+            ZoneIndexEntry.record_type,
+            ZoneIndexEntry.value,
+            ZoneIndexEntry.term,
+        ).join(ZoneIndexFile, ZoneIndexFile.id == ZoneIndexEntry.file_id).filter(
+            *conditions,
+        ).order_by(ZoneIndexEntry.term).limit(limit * 4)
+
+        hits = {}
+        for zone, name, record_type, value, matched in rows:
+            key = (zone, name, record_type)
+            exact = matched in (term, f'{term}.')
+            if key not in hits or (exact and not hits[key].exact):
+                fqdn = f'{name}.{zone}' if name else zone
+                hits[key] = SearchHit(zone=zone, name=name, type=record_type, value=value,
+                                      fqdn=fqdn, exact=exact)
+
+        return sorted(hits.values(), key=lambda h: (not h.exact, h.fqdn, h.type))[:limit]
+
+    def stats(self) -> tuple[int, int]:
+        """Number of indexed files and records."""
+        files, records = db.session.query(
+            db.func.count(ZoneIndexFile.id), db.func.coalesce(db.func.sum(ZoneIndexFile.record_count), 0),
+        ).one()
+        return files, records
+
+
+zone_index = ZoneIndex()
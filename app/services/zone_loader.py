@@ -0,0 +1,251 @@
+"""Zone file loading with an in-memory parse cache.
+
+Zone files are read from libyaml parser events (CSafeLoader's C parser
+when available) and converted straight into compact, immutable records,
+one record set at a time. Parsed zones are cached by path and
+revalidated by (mtime, size), so viewing a large zone again does not
+re-parse it. The cache evicts least recently used zones once the
+estimated size of all cached zones exceeds ``max_bytes``.
+"""
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import yaml
+
+from services.options_service import get_options
+from services.utils import HAS_LIBYAML, SafeLoader
+from services.zone_files import zone_file_name, zone_files_dir
+
+DEFAULT_CACHE_MB = 32
+
+
+def _node(events, event):
+    """Build a plain value from parser events; scalars stay strings."""
+    if isinstance(event, yaml.ScalarEvent):
+        return event.value
+    if isinstance(event, yaml.SequenceStartEvent):
+        items = []
+        for event in events:
+            if isinstance(event, yaml.SequenceEndEvent):
+                return items
+            items.append(_node(events, event))
+    if isinstance(event, yaml.MappingStartEvent):
+        mapping = {}
+        for event in events:
+            if isinstance(event, yaml.MappingEndEvent):
+                return mapping
+            key = _node(events, event)
+            mapping[key if isinstance(key, str) else str(key)] = _node(events, next(events))
+    # Aliases are not resolved; octoDNS zone files do not use them
+    return None
+
+
+def iter_zone_records(stream, strict: bool = False):
+    """Yield (name, records) for every top-level key of a zone file.
+
+    Works on parser events, so only one record set is in memory at a time
+    and PyYAML's (slow) node composition and type resolution are skipped.
+
+    Args:
+        stream: Open zone file.
+        strict: Raise instead of yielding nothing if the top level is not a mapping.
+
+    Raises:
+        yaml.YAMLError: If the file is not valid YAML.
+        ValueError: If strict and the top level is not a mapping.
+    """
+    events = iter(yaml.parse(stream, Loader=SafeLoader))
+    for event in events:
+        if isinstance(event, yaml.MappingStartEvent):
+            break
+        if isinstance(event, (yaml.ScalarEvent, yaml.SequenceStartEvent)):
+            if strict:
+                raise ValueError('top level is not a mapping')
+            return
+    else:
+        return
+    for event in events:
+        if isinstance(event, yaml.MappingEndEvent):
+            return
+        name = _node(events, event)
+        yield name, _node(events, next(events))
+
+
+def _format_value(value) -> str:
+    """'mail.example.com. 10' for {'exchange': ..., 'preference': 10}."""
+    if isinstance(value, dict):
+        return ' '.join(str(v) for v in value.values() if not isinstance(v, (dict, list)))
+    return str(value)
+
+
+class Record:
+    """One record of a zone file (name '' is the zone apex).
+
+    Multiple values are joined into one display string; a zone with
+    100k records then needs roughly 20 MB.
+    """
+    __slots__ = ('name', 'type', 'ttl', 'value')
+
+    def __init__(self, name: str, type: str, ttl: Optional[str], value: str):
+        self.name = name
+        self.type = type
+        self.ttl = ttl
+        self.value = value
+
+    @classmethod
+    def from_data(cls, name: str, data: dict) -> 'Record':
+        raw = data.get('values')
+        if raw is None:
+            raw = [data['value']] if data.get('value') is not None else []
+        elif not isinstance(raw, list):
+            raw = [raw]
+        ttl = data.get('ttl')
+        return cls(
+            name=sys.intern(name),
+            type=sys.intern(str(data['type'])),
+            ttl=sys.intern(ttl) if isinstance(ttl, str) else ttl,
+            value=', '.join(_format_value(v) for v in raw if v is not None),
+        )
+
+    def __repr__(self):
+        return f'<Record {self.name or "@"} {self.type}>'
+
+
+class ZoneFile:
+    """Parsed zone file."""
+    __slots__ = ('zone_name', 'path', 'signature', 'records', 'cost')
+
+    def __init__(self, zone_name: str, path: str, signature: tuple[int, int], records: tuple[Record, ...]):
+        self.zone_name = zone_name
+        self.path = path
+        self.signature = signature
+        self.records = records
+        self.cost = _estimate_size(records)
+
+    def __len__(self):
+        return len(self.records)
+
+
+def _estimate_size(records: tuple[Record, ...]) -> int:
+    """Rough memory footprint of a record tuple in bytes."""
+    # Types and TTLs are interned and shared; names are shared per record set
+    size = sys.getsizeof(records)
+    name = None
+    for record in records:
+        size += sys.getsizeof(record) + sys.getsizeof(record.value)
+        if record.name is not name:
+            size += sys.getsizeof(record.name)
+            name = record.name
+    return size
+
+
+def parse_zone_file(path: str) -> tuple[Record, ...]:
+    """Read all records of a zone file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        yaml.YAMLError: If the file is not valid YAML.
+    """
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for name, data in iter_zone_records(f):
+            name = '' if name is None else str(name)
+            for item in data if isinstance(data, list) else [data]:
+                if isinstance(item, dict) and item.get('type'):
+                    records.append(Record.from_data(name, item))
+    return tuple(records)
+
+
+class ZoneLoader:
+    """LRU cache of parsed zone files, bounded by estimated memory."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.directory: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._zones: OrderedDict[str, ZoneFile] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.directory = zone_files_dir(app)
+        cache_mb = get_options().get('zone_cache_mb')
+        if cache_mb is None:
+            cache_mb = app.config.get('ZONE_CACHE_MB', DEFAULT_CACHE_MB)
+        self.max_bytes = int(float(cache_mb) * 1024 * 1024)
+        self.logger = app.logger
+        if not HAS_LIBYAML:
+            app.logger.warning("PyYAML without libyaml: zone files are parsed by the slow pure Python parser")
+        app.extensions['zone_loader'] = self
+
+    def path(self, zone_name: str) -> str:
+        return os.path.join(self.directory, zone_file_name(zone_name))
+
+    def load(self, zone_name: str) -> Optional[ZoneFile]:
+        """Get a parsed zone file, from the cache if it did not change.
+
+        Returns:
+            ZoneFile, or None if the zone has no file.
+
+        Raises:
+            yaml.YAMLError: If the file is not valid YAML.
+        """
+        path = self.path(zone_name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._zones.get(path)
+            if cached is not None and cached.signature == signature:
+                self._zones.move_to_end(path)
+                self.hits += 1
+                return cached
+
+        zone = ZoneFile(zone_name, path, signature, parse_zone_file(path))
+        with self._lock:
+            self.misses += 1
+            self._discard(path)
+            if zone.cost <= self.max_bytes:
+                self._zones[path] = zone
+                self._size += zone.cost
+                while self._size > self.max_bytes:
+                    _, evicted = self._zones.popitem(last=False)
+                    self._size -= evicted.cost
+        return zone
+
+    def _discard(self, path: str):
+        zone = self._zones.pop(path, None)
+        if zone is not None:
+            self._size -= zone.cost
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drop one cached zone file, or all."""
+        with self._lock:
+            if path is None:
+                self._zones.clear()
+                self._size = 0
+            else:
+                self._discard(path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'zones': len(self._zones),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+zone_loader = ZoneLoader()
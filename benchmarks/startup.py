@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Startup time benchmark.
+
+Profiles imports (python -X importtime) and create_app() in fresh
+interpreters against a throwaway zone directory, in two modes:
+
+    master  first start: tables, migrations, key setup, config generation
+    worker  gunicorn worker: startup tasks already done by the master
+
+Fails if a mode exceeds the time budget or if a module that must load
+lazily (octoDNS, provider packages, cryptography) is imported while a
+worker starts.
+
+Usage:
+    python benchmarks/startup.py [--budget SECONDS] [--top N] [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / 'app'
+
+# Seconds until a worker can serve requests; sized for a Raspberry Pi 4 (aarch64)
+DEFAULT_BUDGET = 3.0
+
+# Top-level modules that must not be imported before the first sync/validation
+LAZY_MODULES = ('octodns', 'octodns_', 'cryptography')
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app(start_runner=False)
+done = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'create_app': done - imported,
+    'total': done - start,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+
+def run_probe(zone_dir: str, worker: bool) -> tuple[dict, list[tuple[str, int, int]]]:
+    """Start the app in a fresh interpreter.
+
+    Returns:
+        Tuple of (timings and loaded modules, [(module, depth, cumulative_us)]).
+    """
+    env = dict(os.environ, ZONE_FILE_PATH=zone_dir, FERNET_KEY='')
+    env.pop('OCTODNS_GUI_STARTUP_DONE', None)
+    if worker:
+        env['OCTODNS_GUI_STARTUP_DONE'] = '1'
+
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE],
+                          cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, _, cumulative_us, name = line.replace(':', '|', 1).split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), depth, int(cumulative_us)))
+    return result, imports
+
+
+def lazy_violations(modules: list[str]) -> list[str]:
+    return [m for m in modules if '.' not in m and m.startswith(LAZY_MODULES)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help=f'seconds per mode (default {DEFAULT_BUDGET})')
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list')
+    parser.add_argument('--runs', type=int, default=3, help='runs per mode (median is used)')
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as zone_dir:
+        for mode in ('master', 'worker'):
+            runs = [run_probe(zone_dir, worker=mode == 'worker') for _ in range(args.runs)]
+            total = statistics.median(r['total'] for r, _ in runs)
+            result, imports = runs[-1]
+
+            print(f"== {mode}: {total:.3f}s (import {result['import']:.3f}s, "
+                  f"create_app {result['create_app']:.3f}s, budget {args.budget:.1f}s)")
+            # Direct imports of the app modules (depth 0/1) show who pulls in what
+            direct = [i for i in imports if i[1] <= 1]
+            for name, _, cumulative in sorted(direct, key=lambda i: -i[2])[:args.top]:
+                print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+            if total > args.budget:
+                print(f"FAIL: {mode} startup over budget")
+                failed = True
+            if mode == 'worker':
+                violations = lazy_violations(result['modules'])
+                if violations:
+                    print(f"FAIL: imported at startup: {', '.join(violations)}")
+                    failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -44,7 +44,8 @@ else
     bashio::log.info "SUPERVISOR_TOKEN found."
 fi
 
-bashio::log.info "Starting Flask server on port 8100..."
+bashio::log.info "Starting web server on port 8100..."
 
-# Start the Python application
-exec python3 /app/app.py
+# Start the application (worker/thread counts: gunicorn.conf.py)
+cd /app
+exec gunicorn --config /app/gunicorn.conf.py wsgi:app
@@ -0,0 +1,36 @@
+"""Shared pytest fixtures.
+
+The app modules import each other as top-level modules (``from extensions
+import db``), so app/ goes on sys.path like in app.py and wsgi.py.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    """App on a fresh SQLite database, without the background job runner."""
+    from app import create_app
+    from config import Config
+
+    path = tmp_path_factory.mktemp('octodns')
+
+    class TestConfig(Config):
+        TESTING = True
+        SECRET_KEY = 'test'
+        ZONE_FILE_PATH = str(path)
+        CONFIG_OUTPUT_DIR = str(path / 'configs')
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}/octodns.db'
+        ADDON_OPTIONS_PATH = str(path / 'options.json')
+        INGRESS_ONLY = False
+        SYNC_RUNNER_ENABLED = False
+
+    app = create_app(TestConfig, start_runner=False)
+    yield app
+
+    from services.validation import validator
+    validator.shutdown()
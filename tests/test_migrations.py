@@ -0,0 +1,60 @@
+"""Databases created by earlier releases must be upgraded at startup.
+
+db.create_all() never adds columns to existing tables, so columns added
+to existing models need a migration.
+"""
+import sqlite3
+
+from sqlalchemy import inspect
+
+from extensions import db
+
+# sync_jobs as created before the job runner (no scope_json, no run_after)
+LEGACY_SYNC_JOBS = '''
+CREATE TABLE sync_jobs (
+    id INTEGER NOT NULL PRIMARY KEY,
+    status VARCHAR(20),
+    trigger_type VARCHAR(20),
+    dry_run BOOLEAN,
+    output TEXT,
+    diff_json JSON,
+    started_at DATETIME,
+    finished_at DATETIME,
+    created_at DATETIME
+)
+'''
+
+
+def test_legacy_sync_jobs_table_is_upgraded(tmp_path):
+    from app import create_app
+    from config import Config
+    from services.migrations import MIGRATIONS
+    from services.validation import validator
+
+    with sqlite3.connect(tmp_path / 'octodns.db') as conn:
+        conn.execute(LEGACY_SYNC_JOBS)
+        conn.execute("INSERT INTO sync_jobs (id, status, trigger_type) VALUES (1, 'success', 'manual')")
+
+    class LegacyConfig(Config):
+        TESTING = True
+        ZONE_FILE_PATH = str(tmp_path)
+        CONFIG_OUTPUT_DIR = str(tmp_path / 'configs')
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/octodns.db'
+        ADDON_OPTIONS_PATH = str(tmp_path / 'options.json')
+        INGRESS_ONLY = False
+        SYNC_RUNNER_ENABLED = False
+
+    app = create_app(LegacyConfig, start_runner=False)
+    try:
+        with app.app_context():
+            columns = {c['name'] for c in inspect(db.engine).get_columns('sync_jobs')}
+            assert {'scope_json', 'run_after'} <= columns
+
+            from models import SchemaMigration, SyncJob
+            assert {m.version for m in SchemaMigration.query} == {v for v, _, _ in MIGRATIONS}
+            job = db.session.get(SyncJob, 1)
+            assert job.status == 'success' and job.scope_json is None
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        validator.shutdown()
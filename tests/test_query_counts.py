@@ -0,0 +1,81 @@
+"""The list pages must run a constant number of queries.
+
+Each page is requested once with N and once with 10×N providers, zones
+and targets; the number of SQL statements must not grow.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from models import Provider, Zone, ZoneTarget
+
+N = 3
+SOURCE_TYPE = 'octodns_netbox_dns.NetBoxDNSSource'
+TARGET_TYPE = 'octodns_bind.ZoneFileProvider'
+
+PAGES = ('/providers/', '/sync/')
+
+
+def _seed(app, count: int):
+    """Add count sources, 2×count targets and count zones with two targets each."""
+    with app.app_context():
+        offset = Zone.query.count()
+        for i in range(offset, offset + count):
+            source = Provider(name=f'source-{i}', provider_type=SOURCE_TYPE, is_source=True, config_json={})
+            targets = [Provider(name=f'target-{i}-{t}', provider_type=TARGET_TYPE, config_json={})
+                       for t in range(2)]
+            db.session.add_all([source, *targets])
+            db.session.flush()
+            zone = Zone(name=f'zone{i}.example.com.', source_id=source.id)
+            db.session.add(zone)
+            db.session.flush()
+            db.session.add_all(ZoneTarget(zone_id=zone.id, target_id=t.id) for t in targets)
+        db.session.commit()
+
+
+@contextmanager
+def _statements(app):
+    """Collect the SQL statements executed inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture(scope='module')
+def counts(app):
+    """Statement counts per page and helper, with N and with 10×N rows."""
+    client = app.test_client()
+    result = {}
+    for count in (N, 9 * N):
+        _seed(app, count)
+        for page in PAGES:
+            client.get(page)  # warm up lazily loaded schemas and caches
+            with _statements(app) as statements:
+                assert client.get(page).status_code == 200
+            result.setdefault(page, []).append(len(statements))
+
+        with app.app_context():
+            from services.provider_service import get_provider_usage
+            provider = Provider.query.filter_by(is_source=False).order_by(Provider.id.desc()).first()
+            with _statements(app) as statements:
+                assert get_provider_usage(provider.id) == (0, 1)
+            result.setdefault('usage', []).append(len(statements))
+    return result
+
+
+@pytest.mark.parametrize('name', PAGES + ('usage',))
+def test_query_count_does_not_grow_with_rows(counts, name):
+    small, large = counts[name]
+    assert small > 0
+    assert large == small